@@ -1,4 +1,5 @@
 import sds
+import sds.variants
 import random
 import functools
 def microtest(hyp, offset, search_space, model):
@@ -18,6 +19,25 @@ def make_microtests(search_space, model):
         for offset
         in range(len(model))
     ]
+def batched_microtest(hyps, offset, search_space, model):
+
+    letter = model[offset]
+    last_hyp = len(search_space) - offset
+
+    return [hyp < last_hyp and search_space[hyp + offset] == letter for hyp in hyps]
+
+
+def make_batched_microtests(search_space, model):
+
+    return [
+        sds.variants.batched(
+            functools.partial(
+                batched_microtest, offset=offset, search_space=search_space, model=model
+            )
+        )
+        for offset
+        in range(len(model))
+    ]
 def main():
 
     agent_count = 50
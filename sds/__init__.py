@@ -1,3 +1,5 @@
+__version__ = "2.0.1"
+
 from sds.standard import (
     Agent,
     D_passive,
@@ -0,0 +1,4 @@
+import sys
+import sds.runner
+
+sys.exit(sds.runner.main())
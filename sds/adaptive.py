@@ -0,0 +1,129 @@
+import collections
+
+
+def agent_index(swarm):
+    """ The index of remaining agents of a reducing swarm, or None """
+
+    index = getattr(swarm, "remaining", None)
+
+    if index is None:
+
+        index = next(
+            (
+                agent.index
+                for agent in swarm
+                if getattr(agent, "index", None) is not None
+            ),
+            None,
+        )
+
+    return index
+
+
+def resize(swarm, agent_count, rng, AgentClass):
+    """ Add or remove agents until the swarm has agent_count agents """
+
+    index = agent_index(swarm)
+
+    if agent_count > len(swarm):
+
+        for count in range(agent_count - len(swarm)):
+
+            agent = AgentClass()
+
+            swarm.append(agent)
+
+            if index is not None:
+
+                index.add(agent)
+
+    elif agent_count < len(swarm):
+
+        agents = swarm.data
+
+        removed = set(rng.sample(range(len(agents)), len(agents) - agent_count))
+
+        dropped = [agents[position] for position in sorted(removed)]
+
+        if index is not None:
+
+            for agent in dropped:
+
+                index.discard(agent)
+
+        agents[:] = [
+            agent for position, agent in enumerate(agents) if position not in removed
+        ] + dropped
+
+        del swarm[agent_count:]
+
+
+def A_cluster_stability(
+    swarm, min_agents, max_agents, window=5, tolerance=0.05, factor=2, min_activity=0
+):
+    """ Makes a function for shrinking the swarm while its largest cluster is
+    stable, and growing it while it is not, or while its activity is at most
+    min_activity """
+
+    shares = collections.deque(maxlen=window)
+
+    largest_hyp = None
+
+    def A():
+
+        nonlocal largest_hyp
+
+        cluster = swarm.largest_cluster
+
+        agent_count = len(swarm)
+
+        if cluster.hyp != largest_hyp:
+
+            shares.clear()
+
+            largest_hyp = cluster.hyp
+
+        shares.append(cluster.size)
+
+        if cluster.agents == 0 or swarm.activity <= min_activity:
+
+            new_count = min(max_agents, agent_count * factor)
+
+        elif len(shares) < window:
+
+            return agent_count
+
+        elif max(shares) - min(shares) < tolerance:
+
+            new_count = max(min_agents, agent_count // factor)
+
+        else:
+
+            new_count = min(max_agents, agent_count * factor)
+
+        if new_count != agent_count:
+
+            shares.clear()
+
+        return new_count
+
+    return A
+
+
+def I_adaptive(I, swarm, A, rng, AgentClass=None):
+
+    if AgentClass is None:
+
+        AgentClass = type(swarm[0])
+
+    def I_prime():
+
+        agent_count = A()
+
+        if agent_count != len(swarm):
+
+            resize(swarm, agent_count, rng, AgentClass)
+
+        I()
+
+    return I_prime
@@ -0,0 +1,40 @@
+import asyncio
+
+
+async def SDS(I, H):
+
+    while not H():
+
+        await I()
+
+
+def T_boolean(TM):
+    """ Boolean testing with coroutine microtests """
+
+    async def T(agent):
+
+        microtest = TM()
+
+        agent.active = await microtest(agent.hyp)
+
+    return T
+
+
+def I_sync(D, T, swarm, concurrency):
+    async def I():
+
+        for agent in swarm:
+
+            D(agent)
+
+        agents = iter(swarm)
+
+        async def worker():
+
+            for agent in agents:
+
+                await T(agent)
+
+        await asyncio.gather(*(worker() for worker_number in range(concurrency)))
+
+    return I
@@ -0,0 +1,475 @@
+""" Benchmarks of every mode of iteration, diffusion, testing and halting """
+import argparse
+import collections
+import functools
+import json
+import logging
+import math
+import platform
+import random
+import sys
+import time
+import sds
+import sds.compiled
+import sds.reducing
+import sds.standard
+import sds.variants
+
+log = logging.getLogger(__name__)
+hypothesis_count = 100
+
+
+def make_swarm(agent_count, rng, SwarmClass=sds.standard.Swarm, AgentClass=sds.Agent):
+
+    swarm = SwarmClass(agent_count=agent_count, AgentClass=AgentClass)
+
+    for agent in swarm:
+
+        agent.active = rng.random() < 0.5
+        agent.hyp = rng.randrange(hypothesis_count)
+
+    return swarm
+
+
+def microtest(hyp, offset):
+
+    return (hyp + offset) % 10 == 0
+
+
+microtests = [functools.partial(microtest, offset=offset) for offset in range(10)]
+
+
+def per_agent(function, swarm):
+    """ Make an iteration which calls function once for each agent """
+
+    def iteration():
+
+        for agent in swarm:
+
+            function(agent)
+
+    return iteration
+
+
+def fresh(bench):
+    """ Mark a benchmark to be set up again before each iteration """
+
+    bench.fresh = True
+
+    return bench
+
+
+def bench_I_sync(agent_count, rng):
+
+    swarm = make_swarm(agent_count, rng)
+    DH = sds.DH_uniform(hypotheses=range(hypothesis_count), rng=rng)
+    D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+    T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+
+    return sds.I_sync(D=D, T=T, swarm=swarm)
+
+
+def bench_I_async(agent_count, rng):
+
+    swarm = make_swarm(agent_count, rng)
+    DH = sds.DH_uniform(hypotheses=range(hypothesis_count), rng=rng)
+    D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+    T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+
+    return sds.variants.I_async(D=D, T=T, swarm=swarm)
+
+
+def bench_I_compiled(agent_count, rng):
+
+    swarm = make_swarm(agent_count, rng)
+
+    return sds.compiled.I_compiled(swarm, range(hypothesis_count), microtests, rng)
+
+
+def bench_diffusion(make_D):
+    @fresh
+    def bench(agent_count, rng):
+
+        swarm = make_swarm(agent_count, rng)
+        DH = sds.DH_uniform(hypotheses=range(hypothesis_count), rng=rng)
+
+        return per_agent(make_D(DH=DH, swarm=swarm, rng=rng), swarm)
+
+    return bench
+
+
+@fresh
+def bench_D_multidiffusion(agent_count, rng):
+
+    swarm = make_swarm(agent_count, rng)
+    DH = sds.DH_uniform(hypotheses=range(hypothesis_count), rng=rng)
+    D = sds.variants.D_multidiffusion(
+        rng=rng, swarm=swarm, multidiffusion_amount=2, DH=DH
+    )
+
+    return per_agent(D, swarm)
+
+
+@fresh
+def bench_D_noise(agent_count, rng):
+
+    swarm = make_swarm(agent_count, rng)
+    DH = sds.variants.DH_continuous(min_hyp=0, max_hyp=hypothesis_count, rng=rng)
+    DN = sds.variants.DN_normal(rng=rng)
+    D = sds.variants.D_noise(swarm=swarm, DN=DN, DH=DH, rng=rng)
+
+    return per_agent(D, swarm)
+
+
+def bench_T_boolean(agent_count, rng):
+
+    swarm = make_swarm(agent_count, rng)
+    T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+
+    return per_agent(T, swarm)
+
+
+def bench_T_comparative(agent_count, rng):
+
+    swarm = make_swarm(agent_count, rng)
+    TM = sds.TM_uniform(microtests, rng=rng)
+    T = sds.variants.T_comparative(TM=TM, swarm=swarm, rng=rng)
+
+    return per_agent(T, swarm)
+
+
+def bench_TM_multitesting(agent_count, rng):
+
+    swarm = make_swarm(agent_count, rng)
+    TM = sds.variants.TM_multitesting(
+        microtests, rng=rng, multitesting_amount=2, combinator=all
+    )
+
+    return per_agent(sds.T_boolean(TM=TM), swarm)
+
+
+@fresh
+def bench_D_qs(agent_count, rng):
+
+    swarm = make_swarm(
+        agent_count,
+        rng,
+        SwarmClass=sds.reducing.ReducingSwarm,
+        AgentClass=sds.reducing.QSAgent,
+    )
+    DH = sds.DH_uniform(hypotheses=range(hypothesis_count), rng=rng)
+    D = sds.reducing.D_qs(DH=DH, quorum_threshold=2, decay=0.9, swarm=swarm, rng=rng)
+
+    return per_agent(D, swarm)
+
+
+@fresh
+def bench_D_running_mean(agent_count, rng):
+
+    swarm = make_swarm(
+        agent_count,
+        rng,
+        SwarmClass=sds.reducing.ReducingSwarm,
+        AgentClass=functools.partial(sds.reducing.QSRunningMeanAgent.new, 5),
+    )
+    DH = sds.DH_uniform(hypotheses=range(hypothesis_count), rng=rng)
+    D = sds.reducing.D_running_mean(
+        DH=DH,
+        quorum_threshold=0.05,
+        min_interaction_count=3,
+        activities=swarm.clusters,
+        swarm=swarm,
+        rng=rng,
+    )
+
+    return per_agent(D, swarm)
+
+
+def bench_reducing_diffusion(make_D):
+    @fresh
+    def bench(agent_count, rng):
+
+        swarm = make_swarm(
+            agent_count,
+            rng,
+            SwarmClass=sds.reducing.ReducingSwarm,
+            AgentClass=sds.reducing.ReducingAgent,
+        )
+        DH = sds.DH_uniform(hypotheses=range(hypothesis_count), rng=rng)
+        D = make_D(swarm=swarm, removed_clusters=collections.Counter(), DH=DH, rng=rng)
+
+        return per_agent(D, swarm)
+
+    return bench
+
+
+def bench_halting(make_H, SwarmClass=sds.standard.Swarm, AgentClass=sds.Agent):
+    def bench(agent_count, rng):
+
+        swarm = make_swarm(
+            agent_count, rng, SwarmClass=SwarmClass, AgentClass=AgentClass
+        )
+
+        return make_H(swarm=swarm, rng=rng)
+
+    return bench
+
+
+benchmarks = {
+    "I_sync": bench_I_sync,
+    "I_async": bench_I_async,
+    "I_compiled": bench_I_compiled,
+    "D_passive": bench_diffusion(sds.D_passive),
+    "D_context_free": bench_diffusion(sds.variants.D_context_free),
+    "D_context_sensitive": bench_diffusion(sds.variants.D_context_sensitive),
+    "D_multidiffusion": bench_D_multidiffusion,
+    "D_noise": bench_D_noise,
+    "T_boolean": bench_T_boolean,
+    "T_comparative": bench_T_comparative,
+    "TM_multitesting": bench_TM_multitesting,
+    "D_qs": bench_D_qs,
+    "D_running_mean": bench_D_running_mean,
+    "D_confirmation": bench_reducing_diffusion(sds.reducing.D_confirmation),
+    "D_independent": bench_reducing_diffusion(sds.reducing.D_independent),
+    "H_fixed": bench_halting(lambda swarm, rng: sds.H_fixed(iterations=math.inf)),
+    "H_threshold": bench_halting(
+        lambda swarm, rng: sds.variants.H_threshold(swarm=swarm, threshold=1)
+    ),
+    "H_largest_cluster_threshold": bench_halting(
+        lambda swarm, rng: sds.variants.H_largest_cluster_threshold(
+            swarm=swarm, threshold=2
+        )
+    ),
+    "H_unique_hyp_count": bench_halting(
+        lambda swarm, rng: sds.variants.H_unique_hyp_count(
+            swarm=swarm, unique_threshold=0
+        )
+    ),
+    "H_elite_cluster_consensus": bench_halting(
+        lambda swarm, rng: sds.variants.H_elite_cluster_consensus(
+            swarm=swarm, elite_count=min(10, len(swarm)), rng=rng
+        )
+    ),
+    "H_stable": bench_halting(
+        lambda swarm, rng: sds.variants.H_stable(
+            swarm=swarm,
+            max_memory_length=10,
+            stability_threshold=-1,
+            min_stable_iterations=1,
+        )
+    ),
+    "H_weak": bench_halting(
+        lambda swarm, rng: sds.variants.H_weak(
+            swarm=swarm,
+            threshold_activity=0.9,
+            stability_threshold=0.05,
+            min_stable_iterations=math.inf,
+        )
+    ),
+    "H_settled_cluster": bench_halting(
+        lambda swarm, rng: sds.variants.H_settled_cluster(
+            swarm=swarm, tolerance=0, window=20
+        )
+    ),
+    "H_settled_activity": bench_halting(
+        lambda swarm, rng: sds.variants.H_settled_activity(
+            swarm=swarm, tolerance=0, window=20
+        )
+    ),
+    "H_strong": bench_halting(
+        lambda swarm, rng: sds.variants.H_strong(
+            swarm=swarm,
+            threshold_cluster_size=len(swarm) // 2,
+            stability_threshold=len(swarm) // 10,
+            min_stable_iterations=math.inf,
+        )
+    ),
+    "H_all_terminating": bench_halting(
+        lambda swarm, rng: sds.reducing.H_all_terminating(swarm=swarm),
+        SwarmClass=sds.reducing.ReducingSwarm,
+        AgentClass=sds.reducing.ReducingAgent,
+    ),
+    "H_empty_swarm": bench_halting(
+        lambda swarm, rng: sds.reducing.H_empty_swarm(swarm=swarm),
+        SwarmClass=sds.reducing.ReducingSwarm,
+        AgentClass=sds.reducing.ReducingAgent,
+    ),
+}
+Result = collections.namedtuple(
+    "Result", ("benchmark", "agent_count", "iterations", "seconds", "agents_per_second")
+)
+
+
+def measure(bench, agent_count, seed, min_time):
+
+    rng = random.Random(seed)
+
+    iteration = bench(agent_count, rng)
+
+    iterations = 0
+
+    seconds = 0
+
+    while True:
+
+        if iterations and getattr(bench, "fresh", False):
+
+            iteration = bench(agent_count, rng)
+
+        start = time.perf_counter()
+
+        iteration()
+
+        seconds += time.perf_counter() - start
+
+        iterations += 1
+
+        if seconds >= min_time:
+
+            break
+
+    return iterations, seconds
+
+
+def run_benchmarks(names, agent_counts, seed=0, min_time=0.2, max_time=10):
+
+    results = []
+
+    for name in names:
+
+        for agent_count in sorted(agent_counts):
+
+            iterations, seconds = measure(benchmarks[name], agent_count, seed, min_time)
+
+            log.info(
+                "%s %s agents %s iterations %.3gs",
+                name,
+                agent_count,
+                iterations,
+                seconds,
+            )
+
+            results.append(
+                Result(
+                    benchmark=name,
+                    agent_count=agent_count,
+                    iterations=iterations,
+                    seconds=seconds,
+                    agents_per_second=agent_count * iterations / seconds,
+                )
+            )
+
+            if seconds / iterations > max_time:
+
+                break
+
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """ Make a list of (result, baseline result) for every result slower than
+    its baseline by more than tolerance """
+
+    baseline_results = {
+        (result.benchmark, result.agent_count): result for result in baseline
+    }
+
+    regressions = []
+
+    for result in results:
+
+        base = baseline_results.get((result.benchmark, result.agent_count))
+
+        if base is None:
+
+            continue
+
+        if result.agents_per_second < (1 - tolerance) * base.agents_per_second:
+
+            regressions.append((result, base))
+
+    return regressions
+
+
+def save_results(results, path):
+
+    document = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result._asdict() for result in results],
+    }
+
+    with open(path, "w") as f:
+
+        json.dump(document, f, indent=2)
+
+
+def load_results(path):
+
+    with open(path) as f:
+
+        document = json.load(f)
+
+    return [Result(**result) for result in document["results"]]
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("benchmarks", nargs="*", default=list(benchmarks))
+    parser.add_argument(
+        "--agent-counts",
+        type=int,
+        nargs="+",
+        default=[10 ** power for power in range(2, 7)],
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--max-time", type=float, default=10)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    results = run_benchmarks(
+        args.benchmarks,
+        args.agent_counts,
+        seed=args.seed,
+        min_time=args.min_time,
+        max_time=args.max_time,
+    )
+
+    for result in results:
+
+        print(
+            f"{result.benchmark:30} {result.agent_count:>9} "
+            f"{result.agents_per_second:>14,.0f} agents/s"
+        )
+
+    if args.output:
+
+        save_results(results, args.output)
+
+    if args.baseline:
+
+        regressions = compare(results, load_results(args.baseline), args.tolerance)
+
+        for result, base in regressions:
+
+            print(
+                f"Regression {result.benchmark} {result.agent_count} agents: "
+                f"{result.agents_per_second:,.0f} agents/s, "
+                f"baseline {base.agents_per_second:,.0f} agents/s"
+            )
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    sys.exit(main())
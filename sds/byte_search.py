@@ -0,0 +1,150 @@
+import functools
+import mmap
+import random
+import sds
+import sds.variants
+
+
+def open_search_space(path):
+    """ Memory-map a file as a read-only search space """
+
+    with open(path, "rb") as f:
+
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def make_hypotheses(search_space, model):
+
+    search_space, model = as_search_space(search_space), as_bytes(model)
+
+    if len(model) > len(search_space):
+
+        raise ValueError(
+            f"Model of {len(model)} bytes is longer than the search space of "
+            f"{len(search_space)} bytes"
+        )
+
+    return range(len(search_space) - len(model) + 1)
+
+
+def microtest(hyp, offset, search_space, model):
+
+    search_space_index = hyp + offset
+
+    return (
+        0 <= search_space_index < len(search_space)
+        and search_space[search_space_index] == model[offset]
+    )
+
+
+def make_microtests(search_space, model):
+
+    search_space, model = as_search_space(search_space), as_bytes(model)
+
+    return [
+        functools.partial(
+            microtest, offset=offset, search_space=search_space, model=model
+        )
+        for offset in range(len(model))
+    ]
+
+
+def batched_microtest(hyps, offset, search_space, model):
+
+    byte = model[offset]
+    end = len(search_space) - offset
+
+    return [0 <= hyp < end and search_space[hyp + offset] == byte for hyp in hyps]
+
+
+def make_batched_microtests(search_space, model):
+
+    search_space, model = as_search_space(search_space), as_bytes(model)
+
+    return [
+        sds.variants.batched(
+            functools.partial(
+                batched_microtest, offset=offset, search_space=search_space, model=model
+            )
+        )
+        for offset in range(len(model))
+    ]
+
+
+def vectorized_microtest(hyp, offset, search_space, model):
+
+    import numpy
+
+    search_space_index = hyp + offset
+
+    in_bounds = (search_space_index >= 0) & (search_space_index < len(search_space))
+
+    result = numpy.zeros(len(hyp), dtype=bool)
+
+    result[in_bounds] = search_space[search_space_index[in_bounds]] == model[offset]
+
+    return result
+
+
+def make_vectorized_microtests(search_space, model):
+
+    import numpy
+
+    search_space = numpy.frombuffer(as_search_space(search_space), dtype=numpy.uint8)
+
+    model = as_bytes(model)
+
+    return [
+        functools.partial(
+            vectorized_microtest, offset=offset, search_space=search_space, model=model
+        )
+        for offset in range(len(model))
+    ]
+
+
+def as_bytes(model):
+
+    if isinstance(model, str):
+
+        return model.encode("utf-8")
+
+    return bytes(model)
+
+
+def as_search_space(search_space):
+
+    if isinstance(search_space, str):
+
+        return search_space.encode("utf-8")
+
+    return search_space
+
+
+def search(search_space, model, agent_count, H, rng=None):
+    """ Search for model in search_space with Standard SDS, halting when H
+    returns true """
+
+    if rng is None:
+
+        rng = random.Random()
+
+    search_space = as_search_space(search_space)
+
+    swarm = sds.Swarm(agent_count=agent_count)
+    DH = sds.DH_uniform(hypotheses=make_hypotheses(search_space, model), rng=rng)
+    D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+    TM = sds.TM_uniform(make_microtests(search_space, model), rng=rng)
+    T = sds.T_boolean(TM=TM)
+    I = sds.I_sync(D=D, T=T, swarm=swarm)
+
+    sds.SDS(I=I, H=H)
+
+    return swarm
+
+
+def search_file(path, model, agent_count, H, rng=None):
+    """ Search for model in the file at path, without loading the file """
+
+    with open_search_space(path) as search_space:
+
+        return search(search_space, model, agent_count, H, rng)
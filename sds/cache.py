@@ -0,0 +1,78 @@
+import collections
+import itertools
+import sds.standard
+
+
+class MicrotestCache:
+    """ A least recently used cache of microtest results """
+
+    def __init__(self, maxsize=2 ** 16):
+
+        self.maxsize = maxsize
+        self.results = collections.OrderedDict()
+        self.microtest_ids = itertools.count()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+
+        return len(self.results)
+
+    def clear(self):
+
+        self.results.clear()
+
+    def cached(self, microtest):
+        """ Wrap a microtest so that its results are cached """
+
+        microtest_id = next(self.microtest_ids)
+
+        results = self.results
+
+        def cached_microtest(hyp):
+
+            key = (microtest_id, hyp)
+
+            try:
+
+                result = results[key]
+
+            except KeyError:
+
+                self.misses += 1
+
+                result = results[key] = microtest(hyp)
+
+                if self.maxsize is not None and len(results) > self.maxsize:
+
+                    results.popitem(last=False)
+
+                    self.evictions += 1
+
+            else:
+
+                self.hits += 1
+
+                results.move_to_end(key)
+
+            return result
+
+        return cached_microtest
+
+    def microtests(self, microtests):
+
+        return [self.cached(microtest) for microtest in microtests]
+
+    def __str__(self):
+
+        return (
+            f"Hits: {self.hits}, misses: {self.misses}, "
+            f"evictions: {self.evictions}, size: {len(self)}"
+        )
+
+
+def TM_cached(microtests, rng, cache):
+    """ Uniformly random selection of cached microtests """
+
+    return sds.standard.TM_uniform(cache.microtests(microtests), rng)
@@ -0,0 +1,370 @@
+import array
+import collections
+import datetime
+import itertools
+import mmap
+import pickle
+import struct
+import sds.reducing
+
+MAGIC = b"SDSCKPT1"
+
+ALIGNMENT = 8
+
+
+def write_checkpoint(path, header, parts):
+
+    with open(path, "wb") as f:
+
+        f.write(MAGIC)
+        f.write(bytes(8))
+
+        offsets = {}
+
+        for name, part in parts.items():
+
+            part = memoryview(part)
+
+            offsets[name] = (part.format, f.tell(), part.nbytes)
+
+            f.write(part.cast("B"))
+
+            f.write(bytes(-f.tell() % ALIGNMENT))
+
+        header_offset = f.tell()
+
+        pickle.dump((header, offsets), f)
+
+        f.seek(len(MAGIC))
+        f.write(struct.pack("<Q", header_offset))
+
+
+def read_checkpoint(path):
+    """ Read the header of a checkpoint, and memory-map its columns """
+
+    with open(path, "rb") as f:
+
+        if f.read(len(MAGIC)) != MAGIC:
+
+            raise ValueError(f"{path} is not a checkpoint")
+
+        (header_offset,) = struct.unpack("<Q", f.read(8))
+
+        f.seek(header_offset)
+
+        header, offsets = pickle.load(f)
+
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+
+    parts = {
+        name: view[offset : offset + nbytes].cast(format)
+        for name, (format, offset, nbytes) in offsets.items()
+    }
+
+    return header, parts
+
+
+def column_kind(values):
+
+    kinds = {type(value) for value in values if value is not None}
+
+    if kinds == {bool}:
+
+        return "bool"
+
+    if kinds <= {int}:
+
+        return "int"
+
+    if kinds <= {int, float}:
+
+        return "float"
+
+    if kinds == {collections.deque}:
+
+        return "deque"
+
+    return "object"
+
+
+def encode_column(name, values):
+
+    kind = column_kind(values)
+
+    column = {"kind": kind}
+
+    parts = {}
+
+    if kind == "bool":
+
+        parts[name] = array.array("B", values)
+
+    elif kind in ("int", "float"):
+
+        typecode = "q" if kind == "int" else "d"
+
+        parts[name] = array.array(
+            typecode, (0 if value is None else value for value in values)
+        )
+
+        if None in values:
+
+            parts[f"{name}.none"] = array.array(
+                "B", (value is None for value in values)
+            )
+
+    elif kind == "deque":
+
+        column["maxlen"] = values[0].maxlen
+
+        parts[f"{name}.lengths"] = array.array("q", map(len, values))
+
+        parts[name] = array.array("d", itertools.chain.from_iterable(values))
+
+    else:
+
+        parts[name] = pickle.dumps(values)
+
+    return column, parts
+
+
+def decode_column(name, column, parts):
+
+    kind = column["kind"]
+
+    if kind == "bool":
+
+        return [bool(value) for value in parts[name]]
+
+    if kind in ("int", "float"):
+
+        values = parts[name].tolist()
+
+        if f"{name}.none" in parts:
+
+            values = [
+                None if none else value
+                for value, none in zip(values, parts[f"{name}.none"])
+            ]
+
+        return values
+
+    if kind == "deque":
+
+        flat = iter(parts[name].tolist())
+
+        return [
+            collections.deque(itertools.islice(flat, length), maxlen=column["maxlen"])
+            for length in parts[f"{name}.lengths"]
+        ]
+
+    return pickle.loads(parts[name])
+
+
+array_swarm_attributes = ("active", "hyp")
+
+
+def is_array_swarm(swarm):
+
+    return not hasattr(swarm, "data") and all(
+        hasattr(swarm, name) for name in array_swarm_attributes
+    )
+
+
+state_types = (
+    bool,
+    int,
+    float,
+    str,
+    type(None),
+    collections.deque,
+    datetime.datetime,
+    datetime.timedelta,
+)
+
+
+def closure_cells(function):
+
+    return zip(function.__code__.co_freevars, function.__closure__ or ())
+
+
+def closure_state(function):
+
+    state = {}
+
+    for name, cell in closure_cells(function):
+
+        value = cell.cell_contents
+
+        if isinstance(value, state_types):
+
+            state[name] = value
+
+        elif getattr(value, "__closure__", None):
+
+            state[name] = closure_state(value)
+
+        elif (
+            isinstance(value, (tuple, list))
+            and value
+            and all(getattr(item, "__closure__", None) for item in value)
+        ):
+
+            state[name] = [closure_state(item) for item in value]
+
+    return state
+
+
+def set_closure_state(function, state):
+
+    cells = dict(closure_cells(function))
+
+    for name, value in state.items():
+
+        cell = cells[name]
+
+        if isinstance(value, dict):
+
+            set_closure_state(cell.cell_contents, value)
+
+        elif isinstance(value, list):
+
+            for item, item_state in zip(cell.cell_contents, value):
+
+                set_closure_state(item, item_state)
+
+        else:
+
+            cell.cell_contents = value
+
+
+def rng_state(rng):
+
+    if hasattr(rng, "getstate"):
+
+        return rng.getstate()
+
+    return rng.bit_generator.state
+
+
+def set_rng_state(rng, state):
+
+    if hasattr(rng, "setstate"):
+
+        rng.setstate(state)
+
+    else:
+
+        rng.bit_generator.state = state
+
+
+def encode_index(swarm):
+
+    positions = {agent: position for position, agent in enumerate(swarm)}
+
+    return {
+        "index.remaining": array.array(
+            "q", (positions[agent] for agent in swarm.remaining)
+        ),
+        "index.removed": array.array(
+            "q", (positions[agent] for agent in swarm.remaining.removed)
+        ),
+    }
+
+
+def restore_index(swarm, parts):
+
+    swarm.remaining = sds.reducing.AgentIndex(
+        agents=(swarm[position] for position in parts["index.remaining"]),
+        removed=(swarm[position] for position in parts["index.removed"]),
+    )
+
+
+def save(path, swarm, rng=None, removed_clusters=None, H=None):
+    """ Save the state of a run to a checkpoint file """
+
+    columns = {}
+    parts = {}
+
+    if is_array_swarm(swarm):
+
+        for name in array_swarm_attributes:
+
+            columns[name] = {"kind": "array"}
+
+            parts[name] = getattr(swarm, name)
+
+    elif len(swarm):
+
+        names = [name for name, value in swarm[0]]
+
+        rows = [[value for name, value in agent] for agent in swarm]
+
+        for name, values in zip(names, zip(*rows)):
+
+            columns[name], column_parts = encode_column(name, list(values))
+
+            parts.update(column_parts)
+
+        if hasattr(swarm, "remaining"):
+
+            parts.update(encode_index(swarm))
+
+    header = {
+        "agent_count": len(swarm),
+        "columns": columns,
+        "rng": None if rng is None else rng_state(rng),
+        "removed_clusters": removed_clusters,
+        "halting": None if H is None else closure_state(H),
+    }
+
+    write_checkpoint(path, header, parts)
+
+
+def restore(path, swarm, rng=None, removed_clusters=None, H=None):
+    """ Restore the state of a run from a checkpoint file """
+
+    header, parts = read_checkpoint(path)
+
+    if header["agent_count"] != len(swarm):
+
+        raise ValueError(
+            f"Checkpoint has {header['agent_count']} agents, swarm has {len(swarm)}"
+        )
+
+    for name, column in header["columns"].items():
+
+        if column["kind"] == "array":
+
+            getattr(swarm, name)[:] = parts[name]
+
+        else:
+
+            for agent, value in zip(swarm, decode_column(name, column, parts)):
+
+                setattr(agent, name, value)
+
+    if hasattr(swarm, "recount"):
+
+        swarm.recount()
+
+    if "index.remaining" in parts:
+
+        restore_index(swarm, parts)
+
+    if rng is not None:
+
+        set_rng_state(rng, header["rng"])
+
+    if removed_clusters is not None:
+
+        removed_clusters.clear()
+        removed_clusters.update(header["removed_clusters"])
+
+    if H is not None:
+
+        set_closure_state(H, header["halting"])
+
+    return header
@@ -0,0 +1,125 @@
+import functools
+import textwrap
+
+diffusion_sources = {
+    "passive": """
+if not agent.active:
+    polled = choice(agents)
+    if polled.active:
+        agent.hyp = polled.hyp
+    else:
+        agent.hyp = choice(hypotheses)
+""",
+    "context_free": """
+polled = choice(agents)
+if not agent.active or polled.active:
+    if not agent.active and polled.active:
+        agent.hyp = polled.hyp
+    else:
+        agent.active = False
+        agent.hyp = choice(hypotheses)
+""",
+    "context_sensitive": """
+polled = choice(agents)
+if polled.active and not agent.active:
+    agent.hyp = polled.hyp
+else:
+    if not agent.active or polled.active and agent.hyp == polled.hyp:
+        agent.active = False
+        agent.hyp = choice(hypotheses)
+""",
+}
+testing_sources = {
+    "boolean": """
+agent.active = choice(microtests)(agent.hyp)
+""",
+}
+iteration_sources = {
+    "sync": """
+for agent in agents:
+{D}
+for agent in agents:
+{T}
+""",
+    "async": """
+for agent in agents:
+{D}
+{T}
+""",
+}
+kernel_template = """
+def make_I(swarm, hypotheses, microtests, rng):
+
+    choice = rng.choice
+
+    def I():
+
+        agents = getattr(swarm, "data", swarm)
+{iteration}
+
+    return I
+"""
+
+
+def select_source(sources, name, mode):
+
+    try:
+
+        return sources[name]
+
+    except KeyError:
+
+        raise ValueError(
+            f"Unknown mode of {mode} {name!r}, expected one of {', '.join(sources)}"
+        )
+
+
+def kernel_source(diffusion, testing, iteration):
+    """ Make the source of a kernel for a combination of modes """
+
+    D = select_source(diffusion_sources, diffusion, "diffusion")
+    T = select_source(testing_sources, testing, "testing")
+    I = select_source(iteration_sources, iteration, "iteration")
+
+    I = I.strip("\n").format(
+        D=textwrap.indent(D.strip("\n"), " " * 4),
+        T=textwrap.indent(T.strip("\n"), " " * 4),
+    )
+
+    return kernel_template.format(iteration=textwrap.indent(I, " " * 8))
+
+
+@functools.lru_cache(maxsize=None)
+def compile_kernel(diffusion, testing, iteration):
+
+    source = kernel_source(diffusion, testing, iteration)
+
+    namespace = {}
+
+    exec(
+        compile(source, f"<sds kernel {diffusion} {testing} {iteration}>", "exec"),
+        namespace,
+    )
+
+    return namespace["make_I"]
+
+
+def I_compiled(
+    swarm,
+    hypotheses,
+    microtests,
+    rng,
+    diffusion="passive",
+    testing="boolean",
+    iteration="sync",
+):
+    """ Make an iteration function with the modes of diffusion, testing and
+    iteration compiled into one loop """
+
+    make_I = compile_kernel(diffusion, testing, iteration)
+
+    I = make_I(swarm, hypotheses, microtests, rng)
+
+    I.source = kernel_source(diffusion, testing, iteration)
+
+    return I
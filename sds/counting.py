@@ -0,0 +1,406 @@
+import bisect
+import collections
+import itertools
+import math
+import numbers
+import sds.standard
+import types
+from sds.standard import Cluster
+
+
+class CountingAgent(sds.standard.Agent):
+    """ An agent which reports changes of its activity and hypothesis to the
+    swarm it belongs to. """
+
+    def __init__(self, active=False, hyp=None, swarm=None):
+
+        self._active = active
+        self._hyp = hyp
+        self.swarm = swarm
+
+    @property
+    def active(self):
+
+        return self._active
+
+    @active.setter
+    def active(self, active):
+
+        was_active = self._active
+
+        self._active = active
+
+        if self.swarm is not None and bool(active) != bool(was_active):
+
+            self.swarm.agent_changed(was_active, self._hyp, active, self._hyp)
+
+    @property
+    def hyp(self):
+
+        return self._hyp
+
+    @hyp.setter
+    def hyp(self, hyp):
+
+        old_hyp = self._hyp
+
+        self._hyp = hyp
+
+        if self.swarm is not None and self._active and hyp != old_hyp:
+
+            self.swarm.agent_changed(True, old_hyp, True, hyp)
+
+
+def check_counting(agent):
+
+    if not isinstance(agent, CountingAgent):
+
+        raise TypeError(
+            f"A counting swarm needs counting agents, not {type(agent).__name__}"
+        )
+
+
+class CountingSwarm(sds.standard.Swarm):
+    def __init__(self, agent_count=None, swarm=None, AgentClass=CountingAgent):
+
+        super().__init__(agent_count=agent_count, swarm=swarm, AgentClass=AgentClass)
+
+        self.recount()
+
+    def recount(self):
+        """ Count every agent from scratch. """
+
+        self._clusters = collections.Counter()
+        self._clusters_view = types.MappingProxyType(self._clusters)
+        self._cluster_sizes = {}
+        self._largest_size = 0
+        self._active_count = 0
+
+        for agent in self:
+
+            check_counting(agent)
+
+            agent.swarm = self
+
+            if agent.active:
+
+                self.agent_changed(False, None, True, agent.hyp)
+
+    def agent_changed(self, was_active, old_hyp, active, hyp):
+
+        if was_active:
+
+            self._active_count -= 1
+
+            self._shrink_cluster(old_hyp)
+
+        if active:
+
+            self._active_count += 1
+
+            self._grow_cluster(hyp)
+
+    def _add(self, agent):
+
+        check_counting(agent)
+
+        agent.swarm = self
+
+        if agent.active:
+
+            self.agent_changed(False, None, True, agent.hyp)
+
+    def _discard(self, agent):
+
+        if agent.active:
+
+            self.agent_changed(True, agent.hyp, False, None)
+
+        agent.swarm = None
+
+    def append(self, agent):
+
+        self._add(agent)
+
+        self.data.append(agent)
+
+    def insert(self, index, agent):
+
+        self._add(agent)
+
+        self.data.insert(index, agent)
+
+    def extend(self, agents):
+
+        for agent in agents:
+
+            self.append(agent)
+
+    def __iadd__(self, agents):
+
+        self.extend(agents)
+
+        return self
+
+    def __setitem__(self, index, value):
+
+        if isinstance(index, slice):
+
+            removed, added = self.data[index], list(value)
+
+        else:
+
+            removed, added = [self.data[index]], [value]
+
+        for agent in added:
+
+            check_counting(agent)
+
+        self.data[index] = added if isinstance(index, slice) else value
+
+        for agent in removed:
+
+            self._discard(agent)
+
+        for agent in added:
+
+            self._add(agent)
+
+    def __delitem__(self, index):
+
+        removed = self.data[index] if isinstance(index, slice) else [self.data[index]]
+
+        for agent in removed:
+
+            self._discard(agent)
+
+        del self.data[index]
+
+    def pop(self, index=-1):
+
+        agent = self.data.pop(index)
+
+        self._discard(agent)
+
+        return agent
+
+    def remove(self, agent):
+
+        self.data.remove(agent)
+
+        self._discard(agent)
+
+    def clear(self):
+
+        for agent in self.data:
+
+            self._discard(agent)
+
+        self.data.clear()
+
+    def _grow_cluster(self, hyp):
+
+        size = self._clusters[hyp]
+
+        if size:
+
+            self._discard_size(hyp, size)
+
+        size += 1
+
+        self._clusters[hyp] = size
+
+        self._cluster_sizes.setdefault(size, {})[hyp] = None
+
+        if size > self._largest_size:
+
+            self._largest_size = size
+
+    def _shrink_cluster(self, hyp):
+
+        size = self._clusters[hyp]
+
+        self._discard_size(hyp, size)
+
+        size -= 1
+
+        if size:
+
+            self._clusters[hyp] = size
+
+            self._cluster_sizes.setdefault(size, {})[hyp] = None
+
+        else:
+
+            del self._clusters[hyp]
+
+    def _discard_size(self, hyp, size):
+
+        hyps = self._cluster_sizes[size]
+
+        del hyps[hyp]
+
+        if not hyps:
+
+            del self._cluster_sizes[size]
+
+            if size == self._largest_size:
+
+                self._largest_size = size - 1
+
+    @property
+    def active_count(self):
+
+        return self._active_count
+
+    @property
+    def activity(self):
+
+        if not self:
+
+            return 0
+
+        return self._active_count / len(self)
+
+    @property
+    def clusters(self):
+
+        return self._clusters_view
+
+    @property
+    def cluster_count(self):
+
+        return len(self._clusters)
+
+    def top_k(self, k):
+        """ The k largest clusters as (hyp, agents) pairs, largest first """
+
+        clusters = []
+
+        for size in sorted(self._cluster_sizes, reverse=True):
+
+            for hyp in self._cluster_sizes[size]:
+
+                if len(clusters) == k:
+
+                    return clusters
+
+                clusters.append((hyp, size))
+
+        return clusters
+
+    def __str__(self):
+
+        return ", ".join(
+            f"(Hyp:{hyp}, Agents:{cluster_size})"
+            for hyp, cluster_size in self.top_k(self.cluster_count)
+        )
+
+    @property
+    def largest_cluster(self):
+
+        agents = self._largest_size
+
+        if agents:
+
+            hyp = next(iter(self._cluster_sizes[agents]))
+
+        else:
+
+            hyp = None
+
+        return Cluster(hyp=hyp, agents=agents, size=agents / len(self))
+
+
+class BinnedSwarm(CountingSwarm):
+    """ A counting swarm which counts agents by the bin of their hypothesis """
+
+    def __init__(self, binning, agent_count=None, swarm=None, AgentClass=CountingAgent):
+
+        self.binning = binning
+
+        super().__init__(agent_count=agent_count, swarm=swarm, AgentClass=AgentClass)
+
+    def agent_changed(self, was_active, old_hyp, active, hyp):
+
+        binning = self.binning
+
+        old_bin = binning(old_hyp) if was_active else None
+
+        new_bin = binning(hyp) if active else None
+
+        if was_active and active and old_bin == new_bin:
+
+            return
+
+        super().agent_changed(was_active, old_bin, active, new_bin)
+
+    def same_cluster(self, hyp, other_hyp):
+
+        return self.binning(hyp) == self.binning(other_hyp)
+
+
+def each(value):
+
+    if isinstance(value, numbers.Real):
+
+        return itertools.repeat(value)
+
+    return value
+
+
+class Grid:
+    """ Bins hypotheses into the cells of a regular grid """
+
+    def __init__(self, width, origin=0):
+
+        self.width = width
+        self.origin = origin
+
+    def __call__(self, hyp):
+
+        if isinstance(hyp, numbers.Real):
+
+            return math.floor((hyp - self.origin) / self.width)
+
+        return tuple(
+            math.floor((x - origin) / width)
+            for x, origin, width in zip(hyp, each(self.origin), each(self.width))
+        )
+
+    def centre(self, cell):
+        """ The hypothesis at the centre of a cell """
+
+        if isinstance(cell, numbers.Integral):
+
+            return self.origin + (cell + 0.5) * self.width
+
+        return tuple(
+            origin + (index + 0.5) * width
+            for index, origin, width in zip(cell, each(self.origin), each(self.width))
+        )
+
+
+class Histogram:
+    """ Bins hypotheses between a sorted list of edges """
+
+    def __init__(self, edges):
+
+        self.edges = list(edges)
+
+    def __call__(self, hyp):
+
+        return bisect.bisect_right(self.edges, hyp) - 1
+
+    def centre(self, index):
+        """ The hypothesis at the centre of a bin """
+
+        if index < 0:
+
+            return self.edges[0]
+
+        if index >= len(self.edges) - 1:
+
+            return self.edges[-1]
+
+        return (self.edges[index] + self.edges[index + 1]) / 2
@@ -0,0 +1,103 @@
+import collections
+import sds.variants
+
+
+class InternTable:
+    """ A table of hypotheses, each with an integer identifier """
+
+    def __init__(self, hypotheses=()):
+
+        self.hypotheses = []
+        self.ids = {}
+
+        for hyp in hypotheses:
+
+            self.intern(hyp)
+
+    def __len__(self):
+
+        return len(self.hypotheses)
+
+    def intern(self, hyp):
+        """ The identifier of a hypothesis, giving it one if it has none """
+
+        try:
+
+            return self.ids[hyp]
+
+        except KeyError:
+
+            hyp_id = self.ids[hyp] = len(self.hypotheses)
+
+            self.hypotheses.append(hyp)
+
+            return hyp_id
+
+    def decode(self, hyp_id):
+
+        if hyp_id is None:
+
+            return None
+
+        return self.hypotheses[hyp_id]
+
+
+def decode_clusters(table, clusters):
+
+    return collections.Counter(
+        {table.hypotheses[hyp_id]: size for hyp_id, size in clusters.items()}
+    )
+
+
+def decode_cluster(table, cluster):
+
+    return cluster._replace(hyp=table.decode(cluster.hyp))
+
+
+def decode_agent(table, agent):
+
+    return dict(agent, hyp=table.decode(agent.hyp))
+
+
+def DH_interned(DH, table):
+    def DH_prime():
+
+        return table.intern(DH())
+
+    return DH_prime
+
+
+def DH_uniform(hypotheses, rng, table):
+    """ Uniformly random selection of interned hypotheses """
+
+    ids = [table.intern(hyp) for hyp in hypotheses]
+
+    def DH():
+
+        return rng.choice(ids)
+
+    return DH
+
+
+def decoded(microtest, table):
+
+    hypotheses = table.hypotheses
+
+    if getattr(microtest, "batched", False):
+
+        def decoded_microtest(hyp_ids):
+
+            return microtest([hypotheses[hyp_id] for hyp_id in hyp_ids])
+
+        return sds.variants.batched(decoded_microtest)
+
+    def decoded_microtest(hyp_id):
+
+        return microtest(hypotheses[hyp_id])
+
+    return decoded_microtest
+
+
+def decoded_microtests(microtests, table):
+
+    return [decoded(microtest, table) for microtest in microtests]
@@ -0,0 +1,168 @@
+import numpy
+import sds
+import sds.byte_search
+import sds.vectorized
+
+
+class Query:
+    """ A search for one model in a shared search space """
+
+    def __init__(self, model, swarm, make_H):
+
+        self.model = model
+        self.swarm = swarm
+        self.H = make_H(swarm)
+        self.halted = False
+        self.iterations = 0
+
+    @property
+    def largest_cluster(self):
+
+        return self.swarm.largest_cluster
+
+
+class Batch:
+    """ The agents of many queries, held in shared arrays """
+
+    def __init__(self, search_space, models, agent_count, make_H, rng):
+
+        self.search_space = numpy.frombuffer(
+            sds.byte_search.as_search_space(search_space), dtype=numpy.uint8
+        )
+
+        models = [sds.byte_search.as_bytes(model) for model in models]
+
+        hyp_counts = [
+            len(sds.byte_search.make_hypotheses(self.search_space, model))
+            for model in models
+        ]
+
+        model_lengths = [len(model) for model in models]
+
+        self.models = numpy.frombuffer(b"".join(models), dtype=numpy.uint8)
+        self.rng = rng
+
+        total = agent_count * len(models)
+
+        self.active = numpy.zeros(total, dtype=bool)
+        self.hyp = numpy.zeros(total, dtype=numpy.int64)
+
+        def per_agent(values):
+
+            return numpy.repeat(numpy.asarray(values, dtype=numpy.int64), agent_count)
+
+        starts = range(0, total, agent_count)
+
+        self.starts = per_agent(starts)
+        self.sizes = per_agent([agent_count] * len(models))
+        self.hyp_counts = per_agent(hyp_counts)
+        self.model_starts = per_agent(numpy.cumsum([0] + model_lengths[:-1]))
+        self.model_lengths = per_agent(model_lengths)
+
+        self.queries = [
+            Query(
+                model,
+                sds.vectorized.Swarm(
+                    active=self.active[start : start + agent_count],
+                    hyp=self.hyp[start : start + agent_count],
+                ),
+                make_H,
+            )
+            for model, start in zip(models, starts)
+        ]
+
+        self.segments = [range(start, start + agent_count) for start in starts]
+
+
+def D_multi(batch, agents):
+
+    inactive = agents[~batch.active[agents]]
+
+    polled = batch.starts[inactive] + batch.rng.integers(batch.sizes[inactive])
+
+    polled_active = batch.active[polled]
+
+    batch.hyp[inactive[polled_active]] = batch.hyp[polled[polled_active]]
+
+    new_hyp = inactive[~polled_active]
+
+    batch.hyp[new_hyp] = batch.rng.integers(batch.hyp_counts[new_hyp])
+
+
+def T_multi(batch, agents):
+
+    offsets = batch.rng.integers(batch.model_lengths[agents])
+
+    positions = batch.hyp[agents] + offsets
+
+    order = numpy.argsort(positions)
+
+    found = numpy.empty(len(agents), dtype=numpy.uint8)
+
+    found[order] = batch.search_space[positions[order]]
+
+    batch.active[agents] = found == batch.models[batch.model_starts[agents] + offsets]
+
+
+def I_multi(batch):
+
+    agents = None
+
+    def I():
+
+        nonlocal agents
+
+        for query in batch.queries:
+
+            if not query.halted and query.H():
+
+                query.halted = True
+
+                agents = None
+
+        if agents is None:
+
+            agents = numpy.array(
+                [
+                    agent
+                    for query, segment in zip(batch.queries, batch.segments)
+                    if not query.halted
+                    for agent in segment
+                ],
+                dtype=numpy.int64,
+            )
+
+        for query in batch.queries:
+
+            if not query.halted:
+
+                query.iterations += 1
+
+        D_multi(batch, agents)
+
+        T_multi(batch, agents)
+
+    return I
+
+
+def H_all_halted(batch):
+    """ Makes a function for halting once every query has halted """
+
+    def H():
+
+        return all(query.halted for query in batch.queries)
+
+    return H
+
+
+def search(search_space, models, agent_count, make_H, seed=None):
+    """ Search for every model in search_space, halting each search when the
+    halting function made by make_H(swarm) returns true """
+
+    batch = Batch(
+        search_space, models, agent_count, make_H, numpy.random.default_rng(seed)
+    )
+
+    sds.SDS(I=I_multi(batch), H=H_all_halted(batch))
+
+    return batch.queries
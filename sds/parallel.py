@@ -0,0 +1,399 @@
+import collections
+import concurrent.futures
+import functools
+import random
+import multiprocessing
+import sds.standard
+import traceback
+import itertools
+
+
+def replicate_seeds(seed, count):
+    """ Make a list of seeds for count replicates from one seed """
+
+    rng = random.Random(seed)
+
+    return [rng.getrandbits(64) for replicate in range(count)]
+
+
+Run = collections.namedtuple(
+    "Run", ("seed", "iterations", "largest_cluster", "clusters")
+)
+
+
+def run_replicate(factory, seed):
+    """ Build an SDS with factory(seed) and iterate it until it halts """
+
+    I, H, swarm = factory(seed)
+
+    iterations = 0
+
+    while not H():
+
+        I()
+
+        iterations += 1
+
+    return Run(
+        seed=seed,
+        iterations=iterations,
+        largest_cluster=swarm.largest_cluster,
+        clusters=collections.Counter(swarm.clusters),
+    )
+
+
+def ensemble(factory, runs, seed=None, processes=None, chunksize=1):
+    """ Run runs replicates of an SDS built by factory, across a pool of
+    processes """
+
+    seeds = replicate_seeds(seed, runs)
+
+    run = functools.partial(run_replicate, factory)
+
+    if processes == 1:
+
+        return Ensemble(map(run, seeds))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+
+        return Ensemble(executor.map(run, seeds, chunksize=chunksize))
+
+
+class Ensemble(collections.UserList):
+    @property
+    def iterations(self):
+
+        return [run.iterations for run in self]
+
+    @property
+    def largest_clusters(self):
+
+        return [run.largest_cluster for run in self]
+
+    @property
+    def convergence(self):
+        """ The number of runs whose largest cluster has each hypothesis """
+
+        return collections.Counter(run.largest_cluster.hyp for run in self)
+
+    @property
+    def clusters(self):
+        """ The final cluster sizes of every run added together """
+
+        clusters = collections.Counter()
+
+        for run in self:
+
+            clusters.update(run.clusters)
+
+        return clusters
+
+
+class IslandError(RuntimeError):
+    """ An exception raised in an island, with its traceback """
+
+
+def island_worker(connection, factory, seed, migration_seed, migration_fraction):
+
+    try:
+
+        run_island(connection, factory, seed, migration_seed, migration_fraction)
+
+    except Exception:
+
+        connection.send(IslandError(traceback.format_exc()))
+
+    finally:
+
+        connection.close()
+
+
+def run_island(connection, factory, seed, migration_seed, migration_fraction):
+
+    I, swarm = factory(seed)
+
+    rng = random.Random(migration_seed)
+
+    migrant_count = round(migration_fraction * len(swarm))
+
+    while True:
+
+        message = connection.recv()
+
+        if message is None:
+
+            break
+
+        immigrants, iterations = message
+
+        for agent, (active, hyp) in zip(rng.sample(swarm, len(immigrants)), immigrants):
+
+            agent.active = active
+            agent.hyp = hyp
+
+        for iteration in range(iterations):
+
+            I()
+
+        emigrants = [
+            (agent.active, agent.hyp) for agent in rng.sample(swarm, migrant_count)
+        ]
+
+        connection.send((collections.Counter(swarm.clusters), len(swarm), emigrants))
+
+
+class IslandSwarm:
+    """ A swarm split into islands, each iterated in its own process """
+
+    def __init__(self, factory, island_count, migration_fraction, seed=None):
+
+        seeds = replicate_seeds(seed, 2 * island_count)
+
+        self.connections = []
+        self.processes = []
+
+        for island in range(island_count):
+
+            connection, worker_connection = multiprocessing.Pipe()
+
+            process = multiprocessing.Process(
+                target=island_worker,
+                args=(
+                    worker_connection,
+                    factory,
+                    seeds[2 * island],
+                    seeds[2 * island + 1],
+                    migration_fraction,
+                ),
+                daemon=True,
+            )
+
+            process.start()
+
+            worker_connection.close()
+
+            self.connections.append(connection)
+            self.processes.append(process)
+
+        self.closed = False
+
+        self.island_clusters = [collections.Counter() for island in range(island_count)]
+        self.island_sizes = [0] * island_count
+        self.immigrants = [[] for island in range(island_count)]
+
+        self.iterate(0)
+
+        self.immigrants = [[] for island in range(island_count)]
+
+    def iterate(self, iterations):
+        """ Iterate every island, then migrate agents between islands """
+
+        for connection, immigrants in zip(self.connections, self.immigrants):
+
+            try:
+
+                connection.send((immigrants, iterations))
+
+            except OSError:  # the island has failed, its error is read below
+
+                pass
+
+        emigrants = []
+
+        for island, connection in enumerate(self.connections):
+
+            try:
+
+                reply = connection.recv()
+
+            except EOFError:
+
+                reply = IslandError(f"Island {island} stopped without replying")
+
+            if isinstance(reply, IslandError):
+
+                self.close()
+
+                raise reply
+
+            clusters, size, island_emigrants = reply
+
+            self.island_clusters[island] = clusters
+            self.island_sizes[island] = size
+
+            emigrants.append(island_emigrants)
+
+        self.immigrants = emigrants[-1:] + emigrants[:-1]
+
+    def close(self):
+
+        if self.closed:
+
+            return
+
+        self.closed = True
+
+        for connection in self.connections:
+
+            try:
+
+                connection.send(None)
+
+            except OSError:
+
+                pass
+
+            connection.close()
+
+        for process in self.processes:
+
+            process.join(timeout=5)
+
+            if process.is_alive():
+
+                process.terminate()
+
+                process.join()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc_info):
+
+        self.close()
+
+    def __len__(self):
+
+        return sum(self.island_sizes)
+
+    def __str__(self):
+
+        return sds.standard.Swarm.__str__(self)
+
+    @property
+    def activity(self):
+
+        if not len(self):
+
+            return 0
+
+        return sum(self.clusters.values()) / len(self)
+
+    @property
+    def clusters(self):
+
+        clusters = collections.Counter()
+
+        for island_clusters in self.island_clusters:
+
+            clusters.update(island_clusters)
+
+        return clusters
+
+    @property
+    def largest_cluster(self):
+
+        return sds.standard.Swarm.largest_cluster.fget(self)
+
+    def report_clusters(self, significant_hypotheses):
+
+        return sds.standard.Swarm.report_clusters(self, significant_hypotheses)
+
+
+def I_islands(swarm, migration_interval):
+    def I():
+
+        swarm.iterate(migration_interval)
+
+    return I
+
+
+def evaluate_chunk(microtests, chunk):
+
+    return [microtests[index](hyp) for index, hyp in chunk]
+
+
+worker_microtests = None
+
+
+def install_microtests(microtests):
+
+    global worker_microtests
+
+    worker_microtests = microtests
+
+
+def evaluate_installed_chunk(chunk):
+
+    return evaluate_chunk(worker_microtests, chunk)
+
+
+class TestPool:
+    """ A pool of threads or processes which perform microtests """
+
+    def __init__(self, microtests, max_workers=None, processes=False):
+
+        self.microtests = microtests
+
+        if processes:
+
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=install_microtests,
+                initargs=(microtests,),
+            )
+
+            self.evaluate_chunk = evaluate_installed_chunk
+
+        else:
+
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers
+            )
+
+            self.evaluate_chunk = functools.partial(evaluate_chunk, microtests)
+
+    def evaluate(self, tests, chunksize):
+        """ Perform a list of (microtest index, hypothesis) tests, returning
+        the results in order """
+
+        chunks = [
+            tests[start : start + chunksize]
+            for start in range(0, len(tests), chunksize)
+        ]
+
+        return itertools.chain.from_iterable(
+            self.executor.map(self.evaluate_chunk, chunks)
+        )
+
+    def close(self):
+
+        self.executor.shutdown()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc_info):
+
+        self.close()
+
+
+def I_pool(D, pool, rng, swarm, chunksize=1024):
+
+    indices = range(len(pool.microtests))
+
+    def I():
+
+        for agent in swarm:
+
+            D(agent)
+
+        tests = [(rng.choice(indices), agent.hyp) for agent in swarm]
+
+        for agent, result in zip(swarm, pool.evaluate(tests, chunksize)):
+
+            agent.active = result
+
+    return I
@@ -0,0 +1,167 @@
+import array
+import collections
+import time
+import sds.standard
+
+
+class Profile:
+    """ Wall time per phase per iteration, and counts of calls """
+
+    def __init__(self):
+
+        self.counters = collections.Counter()
+        self.phase_times = collections.defaultdict(lambda: array.array("d"))
+
+    def counted(self, name, function):
+
+        counters = self.counters
+
+        def counted_function(*args):
+
+            counters[name] += 1
+
+            return function(*args)
+
+        return counted_function
+
+    def D(self, D):
+
+        return self.counted("D", D)
+
+    def T(self, T):
+
+        return self.counted("T", T)
+
+    def DH(self, DH):
+
+        return self.counted("DH", DH)
+
+    def TM(self, TM):
+
+        return self.counted("TM", TM)
+
+    def microtests(self, microtests):
+
+        return [self.counted("microtest", microtest) for microtest in microtests]
+
+    def polls(self, swarm):
+
+        return PollCountingSwarm(swarm, self.counters)
+
+    def timed(self, name, function):
+
+        times = self.phase_times[name]
+
+        def timed_function(*args):
+
+            start = time.perf_counter()
+
+            result = function(*args)
+
+            times.append(time.perf_counter() - start)
+
+            return result
+
+        return timed_function
+
+    def H(self, H):
+
+        return self.timed("H", H)
+
+    def I(self, I):
+
+        return self.timed("I", I)
+
+    def SDS(self, I, H):
+        """ Run SDS, recording the number of iterations and the total time """
+
+        start = time.perf_counter()
+
+        sds.standard.SDS(I=self.I(I), H=self.H(H))
+
+        self.phase_times["SDS"].append(time.perf_counter() - start)
+
+        self.counters["iteration"] = len(self.phase_times["I"])
+
+    def summary(self):
+
+        phases = {
+            name: {
+                "iterations": len(times),
+                "total": sum(times),
+                "mean": sum(times) / len(times),
+                "max": max(times),
+            }
+            for name, times in self.phase_times.items()
+            if times
+        }
+
+        return {"phases": phases, "counters": dict(self.counters)}
+
+    def __str__(self):
+
+        summary = self.summary()
+
+        lines = [
+            f"{name:8} {phase['iterations']:>9} iterations "
+            f"total {phase['total']:.4g}s mean {phase['mean']:.4g}s max {phase['max']:.4g}s"
+            for name, phase in summary["phases"].items()
+        ]
+
+        lines.extend(
+            f"{name:8} {count:>9} calls" for name, count in summary["counters"].items()
+        )
+
+        return "\n".join(lines)
+
+
+class PollCountingSwarm:
+    """ A view of a swarm which counts every agent taken from it """
+
+    def __init__(self, swarm, counters):
+
+        self.swarm = swarm
+        self.counters = counters
+
+    def __len__(self):
+
+        return len(self.swarm)
+
+    def __getitem__(self, index):
+
+        self.counters["poll"] += 1
+
+        return self.swarm[index]
+
+    def __iter__(self):
+
+        return iter(self.swarm)
+
+    def __getattr__(self, name):
+
+        return getattr(self.swarm, name)
+
+
+def I_sync(D, T, swarm, profile):
+
+    D_times = profile.phase_times["D"]
+    T_times = profile.phase_times["T"]
+
+    def I():
+
+        start = time.perf_counter()
+
+        for agent in swarm:
+
+            D(agent)
+
+        diffused = time.perf_counter()
+
+        for agent in swarm:
+
+            T(agent)
+
+        D_times.append(diffused - start)
+        T_times.append(time.perf_counter() - diffused)
+
+    return I
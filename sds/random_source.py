@@ -0,0 +1,78 @@
+import itertools
+import numpy
+
+
+class Stream:
+    """ A stream of uniform random numbers drawn in blocks from a NumPy
+    generator """
+
+    def __init__(self, seed_sequence, block_size=4096):
+
+        self.generator = numpy.random.Generator(numpy.random.PCG64(seed_sequence))
+        self.block_size = block_size
+        self.numbers = iter(())
+
+    def refill(self):
+
+        self.numbers = iter(self.generator.random(self.block_size).tolist())
+
+    def random(self):
+
+        try:
+
+            return next(self.numbers)
+
+        except StopIteration:
+
+            self.refill()
+
+            return next(self.numbers)
+
+    def choice(self, seq):
+
+        try:
+
+            number = next(self.numbers)
+
+        except StopIteration:
+
+            self.refill()
+
+            number = next(self.numbers)
+
+        return seq[int(number * len(seq))]
+
+    def choices(self, population, k=1):
+
+        numbers = list(itertools.islice(self.numbers, k))
+
+        while len(numbers) < k:
+
+            self.refill()
+
+            numbers.extend(itertools.islice(self.numbers, k - len(numbers)))
+
+        indices = numpy.multiply(numbers, len(population)).astype(numpy.int64)
+
+        return [population[index] for index in indices.tolist()]
+
+
+class RandomSource:
+    """ Independent streams of random numbers for polls, hypotheses and
+    microtests """
+
+    def __init__(self, seed=None, block_size=4096):
+
+        self.seed_sequence = numpy.random.SeedSequence(seed)
+        self.block_size = block_size
+        self.polls = self.stream(0)
+        self.hypotheses = self.stream(1)
+        self.microtests = self.stream(2)
+
+    def stream(self, number):
+
+        seed_sequence = numpy.random.SeedSequence(
+            self.seed_sequence.entropy, spawn_key=(number,)
+        )
+
+        return Stream(seed_sequence, self.block_size)
@@ -1,4 +1,6 @@
+import collections
 import sds.standard
+import sds.variants
 import logging
 
 log = logging.getLogger(__name__)
@@ -6,7 +8,7 @@ log = logging.getLogger(__name__)
 
 def D_confirmation(swarm, removed_clusters, DH, rng):
 
-    non_removed_agents = [agent for agent in swarm if not agent.removed]
+    non_removed_agents = remaining_agents(swarm)
 
     def D(agent):
 
@@ -29,7 +31,6 @@ def D_confirmation(swarm, removed_clusters, DH, rng):
                 if polled.terminating:
 
                     agent.remove(final_hyp=polled.hyp)
-                    non_removed_agents.remove(agent)
 
                     removed_clusters[polled.hyp] += 1
 
@@ -46,15 +47,11 @@ def D_confirmation(swarm, removed_clusters, DH, rng):
 
 def D_independent(swarm, removed_clusters, DH, rng):
 
-    remaining_swarm = [agent for agent in swarm if not agent.removed]
-
-    swarm_is_empty = False
+    remaining_swarm = remaining_agents(swarm)
 
     def D(agent):
 
-        nonlocal swarm_is_empty
-
-        if agent.removed or swarm_is_empty:
+        if agent.removed or len(remaining_swarm) < 2:
 
             return
 
@@ -82,16 +79,12 @@ def D_independent(swarm, removed_clusters, DH, rng):
         elif agent.terminating and not polled.terminating:
 
             polled.remove(final_hyp=agent.hyp)
-            remaining_swarm.remove(polled)
-            swarm_is_empty = len(remaining_swarm) < 2
 
             removed_clusters[agent.hyp] += 1
 
         elif polled.terminating and not agent.terminating:
 
             agent.remove(final_hyp=polled.hyp)
-            remaining_swarm.remove(agent)
-            swarm_is_empty = len(remaining_swarm) < 2
 
             removed_clusters[polled.hyp] += 1
 
@@ -102,8 +95,6 @@ def D_independent(swarm, removed_clusters, DH, rng):
             removed, removing = both_agents
 
             removed.remove(final_hyp=removing.hyp)
-            remaining_swarm.remove(removed)
-            swarm_is_empty = len(remaining_swarm) < 2
 
             removed_clusters[removing.hyp] += 1
 
@@ -116,15 +107,11 @@ def D_independent(swarm, removed_clusters, DH, rng):
 
 def D_running_mean(DH, quorum_threshold, min_interaction_count, activities, swarm, rng):
 
-    non_removed_agents = [agent for agent in swarm if not agent.removed]
-
-    swarm_is_empty = False
+    non_removed_agents = remaining_agents(swarm)
 
     def D(agent):
 
-        nonlocal swarm_is_empty
-
-        if agent.removed or swarm_is_empty:
+        if agent.removed or len(non_removed_agents) < 2:
 
             return
 
@@ -149,8 +136,6 @@ def D_running_mean(DH, quorum_threshold, min_interaction_count, activities, swar
                 if not (agent.hyp == polled.hyp):
 
                     polled.remove(final_hyp=agent.hyp)
-                    non_removed_agents.remove(polled)
-                    swarm_is_empty = len(non_removed_agents) < 2
 
             else:  # agent has not sensed quorum
 
@@ -175,15 +160,11 @@ def D_running_mean(DH, quorum_threshold, min_interaction_count, activities, swar
 
 def D_qs(DH, quorum_threshold, decay, swarm, rng):
 
-    non_removed_agents = [agent for agent in swarm if not agent.removed]
-
-    swarm_is_empty = False
+    non_removed_agents = remaining_agents(swarm)
 
     def D(agent):
 
-        nonlocal swarm_is_empty
-
-        if agent.removed or swarm_is_empty:
+        if agent.removed or len(non_removed_agents) < 2:
 
             return
 
@@ -208,8 +189,6 @@ def D_qs(DH, quorum_threshold, decay, swarm, rng):
                 if not (agent.hyp == polled.hyp):
 
                     polled.remove(final_hyp=agent.hyp)
-                    non_removed_agents.remove(polled)
-                    swarm_is_empty = len(non_removed_agents) < 2
 
             else:  # agent has not sensed quorum
 
@@ -229,9 +208,24 @@ def D_qs(DH, quorum_threshold, decay, swarm, rng):
 class ReducingAgent(sds.Agent):
     def __init__(self, active=False, hyp=None, terminating=False, removed=False):
         super().__init__(active=active, hyp=hyp)
-        self.terminating = terminating
+        self.index = None
+        self._terminating = terminating
         self.removed = removed
 
+    @property
+    def terminating(self):
+
+        return self._terminating
+
+    @terminating.setter
+    def terminating(self, terminating):
+
+        if self.index is not None and bool(terminating) != bool(self._terminating):
+
+            self.index.terminating += 1 if terminating else -1
+
+        self._terminating = terminating
+
     def remove(self, final_hyp):
 
         self.removed = True
@@ -239,6 +233,10 @@ class ReducingAgent(sds.Agent):
         self.active = False
         self.terminating = False
 
+        if self.index is not None:
+
+            self.index.remove(self)
+
     def __str__(self):
 
         s = super().__str__()
@@ -281,7 +279,7 @@ class QSAgent(ReducingAgent):
 
     def __iter__(self):
 
-        yield from super().__iter__(self)
+        yield from super().__iter__()
         yield ("confidence", self.confidence)
 
 
@@ -318,11 +316,124 @@ class QSRunningMeanAgent(ReducingAgent):
 
     def __iter__(self):
 
-        yield from super().__iter__(self)
+        yield from super().__iter__()
         yield ("memory", self.memory)
 
 
+class AgentIndex:
+    """ The remaining agents of a swarm, with constant time removal and
+    polling """
+
+    def __init__(self, agents, removed=()):
+
+        self.agents = list(agents)
+        self.positions = {agent: position for position, agent in enumerate(self.agents)}
+        self.removed = list(removed)
+        self.terminating = 0
+
+        for agent in self.agents:
+
+            agent.index = self
+
+            if agent.terminating:
+
+                self.terminating += 1
+
+    def __len__(self):
+
+        return len(self.agents)
+
+    def __getitem__(self, position):
+
+        return self.agents[position]
+
+    def __iter__(self):
+
+        return iter(self.agents)
+
+    def __contains__(self, agent):
+
+        return agent in self.positions
+
+    def remove(self, agent):
+        """ Remove an agent from the index, called by agent.remove """
+
+        position = self.positions.pop(agent)
+
+        agent.index = None
+
+        if agent.terminating:
+
+            self.terminating -= 1
+
+        last = self.agents.pop()
+
+        if last is not agent:
+
+            self.agents[position] = last
+
+            self.positions[last] = position
+
+        self.removed.append(agent)
+
+    def add(self, agent):
+
+        self.positions[agent] = len(self.agents)
+
+        self.agents.append(agent)
+
+        agent.index = self
+
+        if agent.terminating:
+
+            self.terminating += 1
+
+    def discard(self, agent):
+        """ Drop an agent from the index, without keeping it as removed """
+
+        if agent in self.positions:
+
+            self.remove(agent)
+
+            self.removed.pop()
+
+        else:
+
+            self.removed.remove(agent)
+
+
+def remaining_agents(swarm):
+
+    remaining = getattr(swarm, "remaining", None)
+
+    if remaining is None:
+
+        remaining = next(
+            (agent.index for agent in swarm if agent.index is not None), None
+        )
+
+    if remaining is None:
+
+        remaining = AgentIndex(agent for agent in swarm if not agent.removed)
+
+    return remaining
+
+
 class ReducingSwarm(sds.standard.Swarm):
+    def __init__(self, agent_count=None, swarm=None, AgentClass=ReducingAgent):
+
+        super().__init__(agent_count=agent_count, swarm=swarm, AgentClass=AgentClass)
+
+        self.recount()
+
+    def recount(self):
+        """ Index the agents which have not been removed """
+
+        self.remaining = AgentIndex(
+            agents=(agent for agent in self if not agent.removed),
+            removed=(agent for agent in self if agent.removed),
+        )
+
     @property
     def clusters(self):
 
@@ -333,27 +444,32 @@ class ReducingSwarm(sds.standard.Swarm):
     @property
     def size(self):
 
-        return len(self) - len(self.removed)
+        return len(self.remaining)
 
     @property
     def removed(self):
 
-        return [agent for agent in self if agent.removed]
+        return list(self.remaining.removed)
 
 
 def H_all_terminating(swarm):
-    def H():
 
-        halt = all(agent.terminating for agent in swarm if not agent.removed)
+    remaining = remaining_agents(swarm)
 
-        return halt
+    def H():
+
+        return remaining.terminating == len(remaining)
 
     return H
 
 
 def H_empty_swarm(swarm):
+
+    remaining = remaining_agents(swarm)
+
     def H():
-        return all(agent.removed for agent in swarm)
+
+        return not remaining
 
     return H
 
@@ -363,7 +479,7 @@ def H_reducing(swarm):
     is_empty = H_empty_swarm(swarm)
     is_all_terminating = H_all_terminating(swarm)
 
-    return halting_methods.any_functions(is_empty, is_all_terminating)
+    return sds.variants.any_functions(is_empty, is_all_terminating)
 
 
 def T_reducing(TM):
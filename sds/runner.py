@@ -0,0 +1,474 @@
+""" Build SDS runs from a configuration, and run sweeps over grids of
+parameters """
+import argparse
+import collections
+import concurrent.futures
+import copy
+import csv
+import hashlib
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pickle
+import random
+import sds
+import sds.byte_search
+import sds.counting
+import sds.parallel
+import sds.reducing
+import sds.standard
+import sds.variants
+import time
+
+component_modules = (sds.standard, sds.variants, sds.reducing, sds.counting)
+
+mode_names = ("DH", "DN", "TM", "D", "T", "I", "H")
+
+
+def resolve(name):
+
+    for module in component_modules:
+
+        try:
+
+            return getattr(module, name)
+
+        except AttributeError:
+
+            pass
+
+    raise ValueError(f"Unknown component {name!r}")
+
+
+def build(spec, context):
+    """ Call the component named by spec with its parameters, and any other
+    parameters it takes from context """
+
+    parameters = dict(spec)
+
+    function = resolve(parameters.pop("name"))
+
+    for name in inspect.signature(function).parameters:
+
+        if name not in parameters and name in context:
+
+            parameters[name] = context[name]
+
+    return function(**parameters)
+
+
+def open_task(task):
+    """ The search space and model of a string search task """
+
+    if "path" in task:
+
+        search_space = sds.byte_search.open_search_space(task["path"])
+
+    else:
+
+        search_space = sds.byte_search.as_bytes(task["search_space"])
+
+    return search_space, sds.byte_search.as_bytes(task["model"])
+
+
+def find_answer(search_space, model):
+
+    offset = search_space.find(model)
+
+    return None if offset == -1 else offset
+
+
+def with_answer(config, answers):
+    """ The configuration with the answer of its task, found once for each
+    task and kept in answers """
+
+    task = config["task"]
+
+    if "answer" in task or "factory" in task:
+
+        return config
+
+    key = json.dumps(task, sort_keys=True)
+
+    if key not in answers:
+
+        search_space, model = open_task(task)
+
+        answers[key] = find_answer(search_space, model)
+
+        if hasattr(search_space, "close"):
+
+            search_space.close()
+
+    return dict(config, task=dict(task, answer=answers[key]))
+
+
+def make_task(task):
+    """ Make the hypotheses, microtests and answer of a task """
+
+    task = dict(task)
+
+    answer_given = "answer" in task
+
+    answer = task.pop("answer", None)
+
+    if "factory" in task:
+
+        module_name, function_name = task.pop("factory").split(":")
+
+        factory = getattr(importlib.import_module(module_name), function_name)
+
+        hypotheses, microtests = factory(**task)
+
+        return hypotheses, microtests, answer
+
+    search_space, model = open_task(task)
+
+    if not answer_given:
+
+        answer = find_answer(search_space, model)
+
+    return (
+        sds.byte_search.make_hypotheses(search_space, model),
+        sds.byte_search.make_microtests(search_space, model),
+        answer,
+    )
+
+
+def make_sds(config, seed):
+    """ Make the swarm and modes of a configuration """
+
+    hypotheses, microtests, answer = make_task(config["task"])
+
+    swarm_spec = dict(config.get("swarm", {"name": "Swarm"}))
+
+    if "AgentClass" in swarm_spec:
+
+        swarm_spec["AgentClass"] = resolve(swarm_spec["AgentClass"])
+
+    context = {
+        "rng": random.Random(seed),
+        "hypotheses": hypotheses,
+        "microtests": microtests,
+        "removed_clusters": collections.Counter(),
+    }
+
+    context["swarm"] = build(swarm_spec, context)
+
+    for mode_name in mode_names:
+
+        if mode_name in config:
+
+            context[mode_name] = build(config[mode_name], context)
+
+    return context["I"], context["H"], context["swarm"], answer
+
+
+def set_parameter(config, path, value):
+
+    component, parameter = path.split(".", 1)
+
+    config.setdefault(component, {})[parameter] = value
+
+
+def expand_grid(config):
+    """ Make a (point, configuration) pair for each point of the grid """
+
+    grid = config.get("grid", {})
+
+    paths = list(grid)
+
+    points = []
+
+    for values in itertools.product(*(grid[path] for path in paths)):
+
+        point_config = copy.deepcopy(config)
+
+        point_config.pop("grid", None)
+
+        point = dict(zip(paths, values))
+
+        for path, value in point.items():
+
+            set_parameter(point_config, path, value)
+
+        points.append((point, point_config))
+
+    return points
+
+
+Result = collections.namedtuple(
+    "Result",
+    (
+        "seed",
+        "iterations",
+        "seconds",
+        "hyp",
+        "cluster_size",
+        "activity",
+        "converged",
+        "clusters",
+    ),
+)
+
+
+def run(config, seed):
+
+    start = time.perf_counter()
+
+    I, H, swarm, answer = make_sds(config, seed)
+
+    iterations = 0
+
+    while not H():
+
+        I()
+
+        iterations += 1
+
+    seconds = time.perf_counter() - start
+
+    largest_cluster = swarm.largest_cluster
+
+    return Result(
+        seed=seed,
+        iterations=iterations,
+        seconds=seconds,
+        hyp=largest_cluster.hyp,
+        cluster_size=largest_cluster.size,
+        activity=swarm.activity,
+        converged=None if answer is None else largest_cluster.hyp == answer,
+        clusters=collections.Counter(swarm.clusters),
+    )
+
+
+def run_task(task):
+
+    return run(*task)
+
+
+def sweep(config, processes=None, store=None, invalidate=False):
+    """ Run every point of the grid of a configuration, returning a list of
+    (point, results) pairs """
+
+    points = expand_grid(config)
+
+    seeds = sds.parallel.replicate_seeds(config.get("seed"), config.get("runs", 1))
+
+    tasks = [(point_config, seed) for point, point_config in points for seed in seeds]
+
+    if store is None or invalidate:
+
+        results = [None] * len(tasks)
+
+    else:
+
+        results = [store.get(*task) for task in tasks]
+
+    pending = [index for index, result in enumerate(results) if result is None]
+
+    answers = {}
+
+    pending_tasks = [
+        (with_answer(tasks[index][0], answers), tasks[index][1]) for index in pending
+    ]
+
+    if processes == 1:
+
+        finished = map(run_task, pending_tasks)
+
+    else:
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+
+            finished = list(executor.map(run_task, pending_tasks))
+
+    for index, result in zip(pending, finished):
+
+        results[index] = result
+
+        if store is not None:
+
+            store.put(*tasks[index], result)
+
+    return [
+        (point, results[index * len(seeds) : (index + 1) * len(seeds)])
+        for index, (point, point_config) in enumerate(points)
+    ]
+
+
+class ResultStore:
+    """ Results of runs on disk, keyed by a hash of their configuration, seed
+    and the version of the library """
+
+    def __init__(self, directory):
+
+        self.directory = directory
+
+    def key(self, config, seed):
+
+        config = {
+            name: value
+            for name, value in config.items()
+            if name not in ("grid", "runs", "seed")
+        }
+
+        path = config["task"].get("path")
+
+        if path is None:
+
+            stamp = None
+
+        else:
+
+            status = os.stat(path)
+
+            stamp = [status.st_size, status.st_mtime_ns]
+
+        identity = json.dumps(
+            {"config": config, "seed": seed, "version": sds.__version__, "file": stamp},
+            sort_keys=True,
+        )
+
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def path(self, config, seed):
+
+        key = self.key(config, seed)
+
+        return os.path.join(self.directory, key[:2], f"{key}.pickle")
+
+    def get(self, config, seed):
+        """ The stored result of a run, or None """
+
+        try:
+
+            with open(self.path(config, seed), "rb") as f:
+
+                return pickle.load(f)
+
+        except FileNotFoundError:
+
+            return None
+
+    def put(self, config, seed, result):
+
+        path = self.path(config, seed)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+
+        with open(temporary_path, "wb") as f:
+
+            pickle.dump(result, f)
+
+        os.replace(temporary_path, path)
+
+    def invalidate(self, config, seed):
+        """ Remove the stored result of a run """
+
+        try:
+
+            os.remove(self.path(config, seed))
+
+        except FileNotFoundError:
+
+            pass
+
+
+def mean(values):
+
+    values = list(values)
+
+    return sum(values) / len(values) if values else None
+
+
+def summarise(point, results):
+
+    converged = [result.converged for result in results if result.converged is not None]
+
+    row = dict(point)
+
+    row.update(
+        runs=len(results),
+        converged=mean(converged),
+        iterations=mean(result.iterations for result in results),
+        seconds=mean(result.seconds for result in results),
+        cluster_size=mean(result.cluster_size for result in results),
+        activity=mean(result.activity for result in results),
+    )
+
+    return row
+
+
+def write_table(rows, path):
+
+    with open(path, "w", newline="") as f:
+
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+
+        writer.writeheader()
+
+        writer.writerows(rows)
+
+
+def format_value(value):
+
+    if isinstance(value, float):
+
+        return f"{value:.4g}"
+
+    return str(value)
+
+
+def print_table(rows):
+
+    columns = list(rows[0])
+
+    cells = [columns] + [
+        [format_value(row[column]) for column in columns] for row in rows
+    ]
+
+    widths = [max(len(line[index]) for line in cells) for index in range(len(columns))]
+
+    for line in cells:
+
+        print("  ".join(cell.rjust(width) for cell, width in zip(line, widths)))
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog="python -m sds", description="Run a sweep of SDS configurations"
+    )
+    parser.add_argument("config")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--output")
+    parser.add_argument("--store", help="directory of stored results")
+    parser.add_argument("--invalidate", action="store_true")
+
+    args = parser.parse_args(argv)
+
+    with open(args.config) as f:
+
+        config = json.load(f)
+
+    store = None if args.store is None else ResultStore(args.store)
+
+    rows = [
+        summarise(point, results)
+        for point, results in sweep(
+            config, processes=args.processes, store=store, invalidate=args.invalidate
+        )
+    ]
+
+    print_table(rows)
+
+    if args.output:
+
+        write_table(rows, args.output)
+
+    return 0
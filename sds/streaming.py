@@ -0,0 +1,120 @@
+import functools
+import itertools
+
+
+class Window:
+    """ The most recent items of a stream, indexed by their offset in the
+    stream """
+
+    def __init__(self, size):
+
+        self.size = size
+        self.buffer = [None] * size
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+
+        return self.end - self.start
+
+    def __contains__(self, index):
+
+        return self.start <= index < self.end
+
+    def __getitem__(self, index):
+
+        if not self.start <= index < self.end:
+
+            raise IndexError(f"Offset {index} is not in the window")
+
+        return self.buffer[index % self.size]
+
+    def extend(self, chunk):
+        """ Add a chunk of items to the window, removing the oldest items if
+        the window is full """
+
+        kept = chunk[-self.size :]
+
+        self.end += len(chunk) - len(kept)
+
+        position = self.end % self.size
+
+        first = min(len(kept), self.size - position)
+
+        self.buffer[position : position + first] = kept[:first]
+        self.buffer[: len(kept) - first] = kept[first:]
+
+        self.end += len(kept)
+
+        self.start = max(self.start, self.end - self.size)
+
+    def hypotheses(self, model_length):
+
+        return range(self.start, max(self.start, self.end - model_length + 1))
+
+
+def DH_window(window, model_length, rng):
+    """ Uniformly random hypothesis generation from the current window """
+
+    def DH():
+
+        hypotheses = window.hypotheses(model_length)
+
+        if not hypotheses:
+
+            return window.start
+
+        return rng.choice(hypotheses)
+
+    return DH
+
+
+def microtest(hyp, offset, window, model):
+
+    index = hyp + offset
+
+    return window.start <= index < window.end and window[index] == model[offset]
+
+
+def make_microtests(window, model):
+
+    return [
+        functools.partial(microtest, offset=offset, window=window, model=model)
+        for offset in range(len(model))
+    ]
+
+
+def invalidate(swarm, window, DH):
+    """ Give a new hypothesis to every agent whose hypothesis has left the
+    window """
+
+    start = window.start
+
+    for agent in swarm:
+
+        if agent.hyp is not None and agent.hyp < start:
+
+            agent.active = False
+
+            agent.hyp = DH()
+
+
+def I_stream(I, window, stream, swarm, DH, chunks_per_iteration=1):
+
+    stream = iter(stream)
+
+    def I_prime():
+
+        start = window.start
+
+        for chunk in itertools.islice(stream, chunks_per_iteration):
+
+            window.extend(chunk)
+
+        if window.start != start:
+
+            invalidate(swarm, window, DH)
+
+        I()
+
+    return I_prime
@@ -1,10 +1,108 @@
+import asyncio
+import collections
+import contextlib
+import csv
+import functools
+import io
+import itertools
+import json
+import os
+import random
+import tempfile
 import unittest
 import sds
 import sds.standard
 import sds.reducing
 import sds.variants
+import sds.counting
+import sds.parallel
+import sds.benchmark
+import sds.profiling
+import sds.checkpoint
+import sds.byte_search
+import sds.streaming
+import sds.cache
+import sds.asynchronous
+import sds.compiled
+import sds.interning
+import sds.runner
+import sds.adaptive
 import logging
 
+try:
+    import numpy
+except ImportError:  # numpy is only needed by the modules imported below
+    numpy = None
+else:
+    import sds.multi_query
+    import sds.random_source
+    import sds.trace
+    import sds.vectorized
+
+
+def string_search_factory(seed, agent_count=100, iterations=30):
+    search_space = "xxxxxhexlodxxxhelloxxx"
+    model = "hello"
+    rng = random.Random(seed)
+    microtests = [
+        functools.partial(string_search_microtest, offset=n, search_space=search_space)
+        for n in range(len(model))
+    ]
+    swarm = sds.Swarm(agent_count=agent_count)
+    DH = sds.DH_uniform(hypotheses=range(len(search_space)), rng=rng)
+    D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+    T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+    I = sds.I_sync(D=D, T=T, swarm=swarm)
+    H = sds.H_fixed(iterations=iterations)
+    return I, H, swarm
+
+
+def string_search_microtest(hyp, offset, search_space, model="hello"):
+    index = hyp + offset
+    return index < len(search_space) and search_space[index] == model[offset]
+
+
+def string_search_island(seed):
+    I, H, swarm = string_search_factory(seed)
+    return I, swarm
+
+
+def failing_island(seed):
+    I, H, swarm = string_search_factory(seed)
+
+    def failing_I():
+        raise ZeroDivisionError("island failed")
+
+    return failing_I, swarm
+
+
+def failing_factory(seed):
+    raise ValueError("factory failed")
+
+
+def quorum_sensing_run(seed, agent_count=50):
+    search_space = "xxxxxhexlodxxxhelloxxx"
+    rng = random.Random(seed)
+    microtests = [
+        functools.partial(string_search_microtest, offset=n, search_space=search_space)
+        for n in range(5)
+    ]
+    swarm = sds.reducing.ReducingSwarm(
+        agent_count=agent_count, AgentClass=sds.reducing.QSAgent
+    )
+    removed_clusters = collections.Counter()
+    DH = sds.DH_uniform(hypotheses=range(len(search_space)), rng=rng)
+    TM = sds.TM_uniform(microtests, rng=rng)
+    H = sds.H_fixed(iterations=40)
+
+    def make_I():
+        D = sds.reducing.D_qs(
+            DH=DH, quorum_threshold=3, decay=0.9, swarm=swarm, rng=rng
+        )
+        return sds.I_sync(D=D, T=sds.reducing.T_reducing(TM=TM), swarm=swarm)
+
+    return swarm, rng, removed_clusters, H, make_I
+
 
 class TestSDS(unittest.TestCase):
     def setUp(self):
@@ -18,3 +116,936 @@ class TestSDS(unittest.TestCase):
         agent = sds.Agent(hyp="hello", active=True)
         self.assertEqual(agent.hyp, "hello")
         self.assertTrue(agent.active)
+
+    def test_batched_testing(self):
+        rng = random.Random(0)
+        calls = []
+
+        @sds.variants.batched
+        def all_pass(hyps):
+            calls.append(len(hyps))
+            return [True for hyp in hyps]
+
+        def none_pass(hyp):
+            return False
+
+        swarm = sds.Swarm(swarm=[sds.Agent(hyp=hyp) for hyp in range(100)])
+        TM = sds.variants.TM_batched([all_pass, none_pass], rng=rng)
+        T = sds.variants.T_batched(TM=TM)
+        T(swarm)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sum(calls), sum(agent.active for agent in swarm))
+        self.assertTrue(0 < swarm.activity < 1)
+
+    def test_sequential_halting(self):
+        self.assertEqual(sds.variants.trend_confidence([0.5] * 10, tolerance=0.05), 1.0)
+        growing = [n / 20 + (n % 2) / 100 for n in range(20)]
+        self.assertLess(sds.variants.trend_confidence(growing, tolerance=0.05), 0.01)
+        noisy = [0.8 + (n % 3 - 1) / 100 for n in range(20)]
+        self.assertGreater(sds.variants.trend_confidence(noisy, tolerance=0.05), 0.99)
+        self.assertRaises(ValueError, sds.variants.trend_confidence, [0.5, 0.5], 0.05)
+        for window in (1, 2):
+            with self.assertRaises(ValueError):
+                sds.variants.H_settled_cluster(
+                    sds.Swarm(agent_count=1), 0.05, window=window
+                )
+            with self.assertRaises(ValueError):
+                sds.variants.H_settled_activity(
+                    sds.Swarm(agent_count=1), 0.05, window=window
+                )
+        I, H, swarm = string_search_factory(seed=0, agent_count=100, iterations=1000)
+        H_cluster = sds.variants.H_settled_cluster(swarm, tolerance=0.05, window=20)
+        H_activity = sds.variants.H_settled_activity(swarm, tolerance=0.05, window=20)
+        H = sds.variants.all_functions(H_cluster, H_activity)
+        iterations = 0
+        while not H():
+            I()
+            iterations += 1
+        self.assertLess(iterations, 100)
+        self.assertEqual(swarm.largest_cluster.hyp, 14)
+        self.assertGreaterEqual(H_cluster.confidence, 0.95)
+        self.assertGreaterEqual(H_activity.confidence, 0.95)
+
+    def test_halting_schedules(self):
+        calls = []
+
+        def H():
+            calls.append(True)
+            return len(calls) == 3
+
+        H = sds.variants.H_every(H, iterations=4)
+        halted_at = next(n for n in itertools.count(1) if H())
+        self.assertEqual(halted_at, 12)
+        H = sds.variants.H_interval(lambda: True, seconds=3600)
+        self.assertTrue(H())
+        self.assertFalse(H())
+
+    def test_stable(self):
+        swarm = sds.Swarm(swarm=[sds.Agent(), sds.Agent()])
+        H = sds.variants.H_stable(
+            swarm, max_memory_length=3, stability_threshold=0.1, min_stable_iterations=2
+        )
+        halts = []
+        for activities in [(1, 0), (1, 1), (1, 1), (1, 1), (1, 1), (1, 1)]:
+            for agent, active in zip(swarm, activities):
+                agent.active = active
+            halts.append(H())
+        self.assertEqual(halts, [False, False, False, False, True, True])
+
+    def test_agent_index(self):
+        swarm = sds.reducing.ReducingSwarm(agent_count=10)
+        agents = list(swarm)
+        for agent in agents[:4]:
+            agent.remove(final_hyp=None)
+        self.assertEqual(swarm.size, 6)
+        self.assertEqual(swarm.removed, agents[:4])
+        self.assertEqual(sorted(map(id, swarm.remaining)), sorted(map(id, agents[4:])))
+        self.assertNotIn(agents[0], swarm.remaining)
+        rng = random.Random(0)
+        self.assertTrue(
+            all(rng.choice(swarm.remaining) in agents[4:] for n in range(100))
+        )
+
+    def test_reducing_halting(self):
+        swarm = sds.reducing.ReducingSwarm(agent_count=10)
+        H = sds.reducing.H_all_terminating(swarm)
+        H_empty = sds.reducing.H_empty_swarm(swarm)
+        H_empty_list = sds.reducing.H_empty_swarm(list(swarm))
+        for agent in swarm:
+            self.assertFalse(H())
+            agent.terminating = True
+        self.assertTrue(H())
+        for agent in swarm:
+            self.assertFalse(H_empty())
+            self.assertFalse(H_empty_list())
+            agent.remove(final_hyp=None)
+        self.assertTrue(H_empty())
+        self.assertTrue(H_empty_list())
+        self.assertEqual(swarm.size, 0)
+        self.assertEqual(swarm.removed, list(swarm))
+        swarm = sds.reducing.ReducingSwarm(agent_count=4)
+        H = sds.reducing.H_all_terminating(swarm)
+        new_agent = sds.reducing.ReducingAgent()
+        swarm.append(new_agent)
+        swarm.remaining.add(new_agent)
+        for agent in list(swarm)[:4]:
+            agent.terminating = True
+        self.assertFalse(H())
+        self.assertEqual(swarm.remaining.terminating, 4)
+        list(swarm)[0].remove(final_hyp=None)
+        self.assertEqual(swarm.remaining.terminating, 3)
+        new_agent.terminating = True
+        self.assertTrue(H())
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_vectorized_passive_diffusion(self):
+        rng = numpy.random.default_rng(0)
+        swarm = sds.vectorized.Swarm(
+            active=[True, False, False, False], hyp=[7, 0, 0, 0]
+        )
+        DH = sds.vectorized.DH_uniform(hypotheses=[-1], rng=rng)
+        D = sds.vectorized.D_passive(DH=DH, swarm=swarm, rng=rng)
+        D(swarm)
+        self.assertEqual(swarm.hyp[0], 7)
+        self.assertTrue(set(swarm.hyp[1:].tolist()) <= {7, -1})
+        self.assertEqual(swarm.activity, 0.25)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_vectorized_string_search(self):
+        rng = numpy.random.default_rng(0)
+        model = numpy.frombuffer(b"hello", dtype=numpy.uint8)
+        search_space = numpy.frombuffer(b"xxxxxhexlodxxxhelloxxx", dtype=numpy.uint8)
+
+        def microtest(hyp, offset):
+            index = hyp + offset
+            result = numpy.zeros(len(hyp), dtype=bool)
+            in_bounds = index < len(search_space)
+            result[in_bounds] = search_space[index[in_bounds]] == model[offset]
+            return result
+
+        microtests = [functools.partial(microtest, offset=n) for n in range(len(model))]
+        swarm = sds.vectorized.Swarm(agent_count=1000)
+        DH = sds.vectorized.DH_uniform(hypotheses=range(len(search_space)), rng=rng)
+        D = sds.vectorized.D_passive(DH=DH, swarm=swarm, rng=rng)
+        TM = sds.vectorized.TM_uniform(microtests, rng=rng)
+        T = sds.vectorized.T_boolean(TM=TM)
+        I = sds.vectorized.I_sync(D=D, T=T, swarm=swarm)
+        sds.SDS(I=I, H=sds.H_fixed(iterations=50))
+        self.assertEqual(swarm.largest_cluster.hyp, 14)
+        self.assertEqual(swarm.clusters[14], swarm.largest_cluster.agents)
+
+    def test_counting_swarm(self):
+        rng = random.Random(0)
+        search_space = "xxxxxhexlodxxxhelloxxx"
+        model = "hello"
+
+        def microtest(hyp, offset):
+            index = hyp + offset
+            return index < len(search_space) and search_space[index] == model[offset]
+
+        microtests = [functools.partial(microtest, offset=n) for n in range(len(model))]
+        swarm = sds.counting.CountingSwarm(agent_count=100)
+        DH = sds.DH_uniform(hypotheses=range(len(search_space)), rng=rng)
+        D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+        T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+        I = sds.I_sync(D=D, T=T, swarm=swarm)
+        for iteration in range(30):
+            I()
+            counted = sds.Swarm(swarm=list(swarm))
+            self.assertEqual(swarm.clusters, counted.clusters)
+            self.assertEqual(swarm.activity, counted.activity)
+            self.assertEqual(
+                swarm.largest_cluster.agents, counted.largest_cluster.agents
+            )
+        self.assertEqual(swarm.largest_cluster.hyp, 14)
+        with self.assertRaises(TypeError):
+            swarm.clusters[14] += 1000
+        self.assertEqual(swarm.cluster_count, len(counted.clusters))
+        self.assertEqual(
+            [agents for hyp, agents in swarm.top_k(3)],
+            [agents for hyp, agents in counted.clusters.most_common(3)],
+        )
+        swarm.append(sds.counting.CountingAgent(active=True, hyp=3))
+        swarm.extend([sds.counting.CountingAgent(active=True, hyp=3)])
+        swarm[0] = sds.counting.CountingAgent(active=True, hyp=14)
+        swarm.insert(0, swarm.pop())
+        del swarm[1:3]
+        swarm[4:5] = [sds.counting.CountingAgent(active=True, hyp=2)]
+        counted = sds.Swarm(swarm=list(swarm))
+        self.assertEqual(swarm.clusters, counted.clusters)
+        self.assertEqual(swarm.activity, counted.activity)
+        self.assertEqual(swarm.largest_cluster.agents, counted.largest_cluster.agents)
+        with self.assertRaises(ValueError):
+            swarm[::2] = [sds.counting.CountingAgent(active=True, hyp=2)]
+        self.assertEqual(swarm.clusters, counted.clusters)
+        self.assertRaises(TypeError, swarm.append, sds.Agent(active=True, hyp=2))
+        self.assertRaises(TypeError, sds.counting.CountingSwarm, swarm=[sds.Agent()])
+        tied = sds.counting.CountingSwarm(swarm=[])
+        tied.extend(sds.counting.CountingAgent(active=True, hyp=hyp) for hyp in "dcba")
+        self.assertEqual(tied.largest_cluster.hyp, "d")
+        tied[0].active = False
+        tied[0].active = True
+        self.assertEqual(tied.largest_cluster.hyp, "c")
+
+    def test_binned_swarm(self):
+        rng = random.Random(0)
+        grid = sds.counting.Grid(width=1)
+        swarm = sds.counting.BinnedSwarm(binning=grid, agent_count=200)
+        DH = sds.variants.DH_continuous(min_hyp=0, max_hyp=20, rng=rng)
+        DN = sds.variants.DN_gauss(mean=0, sigma=0.1, rng=rng)
+        D = sds.variants.D_noise(swarm=swarm, DN=DN, DH=DH, rng=rng)
+        microtests = [lambda hyp: abs(hyp - 7.5) < 0.5, lambda hyp: rng.random() < 0.5]
+        T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+        I = sds.I_sync(D=D, T=T, swarm=swarm)
+        H = sds.variants.H_elite_cluster_consensus(swarm=swarm, elite_count=3, rng=rng)
+        for iteration in range(50):
+            I()
+            binned = collections.Counter(
+                grid(agent.hyp) for agent in swarm if agent.active
+            )
+            self.assertEqual(swarm.clusters, binned)
+            self.assertEqual(swarm.largest_cluster.agents, max(binned.values()))
+        self.assertEqual(swarm.largest_cluster.hyp, 7)
+        self.assertEqual(grid.centre(7), 7.5)
+        self.assertLess(len(swarm.clusters), 10)
+        for agent in swarm:
+            agent.active, agent.hyp = True, 7 + rng.random()
+        self.assertTrue(H())
+        plane = sds.counting.Grid(width=(1, 0.5), origin=-1)
+        self.assertEqual(plane((0.5, 0.2)), (1, 2))
+        self.assertEqual(plane.centre((1, 2)), (0.5, 0.25))
+        histogram = sds.counting.Histogram(edges=[0, 1, 10])
+        self.assertEqual([histogram(hyp) for hyp in (-1, 0, 5, 10)], [-1, 0, 1, 2])
+
+    def test_ensemble(self):
+        serial = sds.parallel.ensemble(
+            string_search_factory, runs=4, seed=1, processes=1
+        )
+        pooled = sds.parallel.ensemble(
+            string_search_factory, runs=4, seed=1, processes=2
+        )
+        self.assertEqual(serial, pooled)
+        self.assertEqual(serial.iterations, [30] * 4)
+        self.assertEqual(serial.convergence, collections.Counter({14: 4}))
+
+    def test_islands(self):
+        with sds.parallel.IslandSwarm(
+            string_search_island, island_count=2, migration_fraction=0.1, seed=1
+        ) as swarm:
+            I = sds.parallel.I_islands(swarm=swarm, migration_interval=5)
+            H = sds.H_fixed(iterations=6)
+            sds.SDS(I=I, H=H)
+            self.assertEqual(len(swarm), 200)
+            self.assertEqual(swarm.largest_cluster.hyp, 14)
+            self.assertEqual(sum(swarm.clusters.values()), swarm.activity * 200)
+        with sds.parallel.IslandSwarm(
+            failing_island, island_count=2, migration_fraction=0.1
+        ) as swarm:
+            with self.assertRaisesRegex(sds.parallel.IslandError, "ZeroDivisionError"):
+                swarm.iterate(1)
+            self.assertFalse(any(process.is_alive() for process in swarm.processes))
+        with self.assertRaisesRegex(sds.parallel.IslandError, "factory failed"):
+            sds.parallel.IslandSwarm(
+                failing_factory, island_count=2, migration_fraction=0.1
+            )
+
+    def test_parallel_testing(self):
+        search_space = "xxxxxhexlodxxxhelloxxx"
+        microtests = [
+            functools.partial(
+                string_search_microtest, offset=n, search_space=search_space
+            )
+            for n in range(5)
+        ]
+
+        def run(pool=None):
+            rng = random.Random(0)
+            swarm = sds.Swarm(agent_count=100)
+            DH = sds.DH_uniform(hypotheses=range(len(search_space)), rng=rng)
+            D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+            if pool is None:
+                T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+                I = sds.I_sync(D=D, T=T, swarm=swarm)
+            else:
+                I = sds.parallel.I_pool(
+                    D=D, pool=pool, rng=rng, swarm=swarm, chunksize=7
+                )
+            sds.SDS(I=I, H=sds.H_fixed(iterations=20))
+            return [dict(agent) for agent in swarm]
+
+        expected = run()
+        with sds.parallel.TestPool(microtests, max_workers=3) as pool:
+            self.assertEqual(run(pool), expected)
+        with sds.parallel.TestPool(microtests, max_workers=2, processes=True) as pool:
+            self.assertEqual(run(pool), expected)
+
+    def test_benchmarks(self):
+        results = sds.benchmark.run_benchmarks(
+            sds.benchmark.benchmarks, agent_counts=[20], min_time=0
+        )
+        self.assertEqual(len(results), len(sds.benchmark.benchmarks))
+        self.assertFalse(sds.benchmark.compare(results, results))
+        slower = [result._replace(agents_per_second=0) for result in results]
+        self.assertEqual(len(sds.benchmark.compare(slower, results)), len(results))
+
+    def test_profile(self):
+        rng = random.Random(0)
+        profile = sds.profiling.Profile()
+        search_space = "xxxxxhexlodxxxhelloxxx"
+        microtests = [
+            functools.partial(
+                string_search_microtest, offset=n, search_space=search_space
+            )
+            for n in range(5)
+        ]
+        swarm = profile.polls(sds.Swarm(agent_count=100))
+        DH = profile.DH(sds.DH_uniform(hypotheses=range(len(search_space)), rng=rng))
+        D = profile.D(sds.D_passive(DH=DH, swarm=swarm, rng=rng))
+        TM = profile.TM(sds.TM_uniform(profile.microtests(microtests), rng=rng))
+        T = profile.T(sds.T_boolean(TM=TM))
+        I = sds.profiling.I_sync(D=D, T=T, swarm=swarm, profile=profile)
+        profile.SDS(I=I, H=sds.H_fixed(iterations=10))
+        counters = profile.summary()["counters"]
+        self.assertEqual(counters["iteration"], 10)
+        self.assertEqual(counters["D"], 1000)
+        self.assertEqual(counters["microtest"], 1000)
+        self.assertEqual(counters["TM"], 1000)
+        self.assertTrue(counters["DH"] <= counters["poll"] <= counters["D"])
+        self.assertEqual(len(profile.phase_times["D"]), 10)
+        self.assertEqual(len(profile.phase_times["H"]), 11)
+        self.assertIn("microtest", str(profile))
+
+    def test_checkpoint(self):
+        swarm, rng, removed_clusters, H, make_I = quorum_sensing_run(seed=1)
+        sds.SDS(I=make_I(), H=H)
+        expected = [dict(agent) for agent in swarm]
+
+        swarm, rng, removed_clusters, H, make_I = quorum_sensing_run(seed=1)
+        I = make_I()
+        for iteration in range(10):
+            H()
+            I()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.ckpt")
+            sds.checkpoint.save(path, swarm, rng, removed_clusters, H)
+            swarm, rng, removed_clusters, H, make_I = quorum_sensing_run(seed=2)
+            sds.checkpoint.restore(path, swarm, rng, removed_clusters, H)
+
+        sds.SDS(I=make_I(), H=H)
+        self.assertEqual([dict(agent) for agent in swarm], expected)
+
+        drained = sds.reducing.ReducingSwarm(
+            agent_count=10, AgentClass=sds.reducing.QSAgent
+        )
+        for agent in list(drained)[1:]:
+            agent.remove(final_hyp=0)
+        drained.recount()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "drained.ckpt")
+            sds.checkpoint.save(path, drained)
+            swarm = sds.reducing.ReducingSwarm(
+                agent_count=10, AgentClass=sds.reducing.QSAgent
+            )
+            sds.checkpoint.restore(path, swarm)
+        rng = random.Random(0)
+        state = rng.getstate()
+        DH = sds.DH_uniform(hypotheses=range(10), rng=rng)
+        D_qs = sds.reducing.D_qs(
+            DH=DH, quorum_threshold=3, decay=0.9, swarm=swarm, rng=rng
+        )
+        D_independent = sds.reducing.D_independent(
+            swarm, collections.Counter(), DH, rng
+        )
+        D_qs(swarm[0])
+        D_independent(swarm[0])
+        self.assertEqual(rng.getstate(), state)
+
+    def test_byte_search(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "search_space")
+            with open(path, "wb") as f:
+                f.write(b"x" * 10000 + b"hello" + b"x" * 10000)
+            swarm = sds.byte_search.search_file(
+                path,
+                "hello",
+                agent_count=1000,
+                H=sds.H_fixed(100),
+                rng=random.Random(0),
+            )
+        self.assertEqual(swarm.largest_cluster.hyp, 10000)
+        search_space = memoryview(b"hexlo")
+        microtests = sds.byte_search.make_batched_microtests(search_space, "hello")
+        self.assertEqual(
+            [microtest([0, 1, 5])[0] for microtest in microtests],
+            [True, True, False, True, True],
+        )
+        swarm = sds.byte_search.search(
+            "xxxxxhexlodxxxhelloxxx", "hello", 50, sds.H_fixed(30), rng=random.Random(0)
+        )
+        self.assertEqual(swarm.largest_cluster.hyp, 14)
+        with self.assertRaises(ValueError):
+            sds.byte_search.make_hypotheses(b"hell", "hello")
+
+    def test_stream(self):
+        rng = random.Random(0)
+        stream = [b"x" * 45 + b"hello" + b"x" * 50] + [b"x" * 20] * 20
+        window = sds.streaming.Window(size=200)
+        model = b"hello"
+        swarm = sds.Swarm(agent_count=100)
+        DH = sds.streaming.DH_window(window=window, model_length=len(model), rng=rng)
+        D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+        TM = sds.TM_uniform(sds.streaming.make_microtests(window, model), rng=rng)
+        I = sds.I_sync(D=D, T=sds.T_boolean(TM=TM), swarm=swarm)
+        I = sds.streaming.I_stream(
+            I=I, window=window, stream=stream, swarm=swarm, DH=DH
+        )
+        I()
+        self.assertEqual(window.end, 100)
+        self.assertEqual(window[45], ord("h"))
+        found = False
+        for iteration in range(30):
+            I()
+            found = found or swarm.largest_cluster.hyp == 45
+        self.assertTrue(found)
+        self.assertEqual((window.start, window.end), (300, 500))
+        self.assertTrue(all(agent.hyp >= window.start for agent in swarm))
+        self.assertNotIn(45, swarm.clusters)
+
+    def test_microtest_cache(self):
+        calls = collections.Counter()
+
+        def microtest(hyp):
+            calls[hyp] += 1
+            return hyp % 2 == 0
+
+        cache = sds.cache.MicrotestCache(maxsize=2)
+        cached_microtest, other_microtest = cache.microtests([microtest, microtest])
+        results = [cached_microtest(hyp) for hyp in (1, 2, 1, 2, 3, 1)]
+        self.assertEqual(results, [False, True, False, True, False, False])
+        self.assertEqual(calls, collections.Counter({1: 2, 2: 1, 3: 1}))
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (2, 4, 2))
+        other_microtest(3)
+        self.assertEqual(cache.misses, 5)
+
+    def test_asynchronous_testing(self):
+        search_space = b"xxxxxhexlodxxxhelloxxx"
+        model = b"hello"
+        serving = collections.Counter()
+
+        async def serve(reader, writer):
+            serving["now"] += 1
+            serving["most"] = max(serving["most"], serving["now"])
+            hyp, offset = map(int, (await reader.readline()).split())
+            await asyncio.sleep(0)
+            index = hyp + offset
+            passed = index < len(search_space) and search_space[index] == model[offset]
+            serving["now"] -= 1
+            writer.write(b"1\n" if passed else b"0\n")
+            await writer.drain()
+            writer.close()
+
+        async def microtest(hyp, offset, port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"{hyp} {offset}\n".encode())
+            result = await reader.readline()
+            writer.close()
+            return result == b"1\n"
+
+        async def search():
+            server = await asyncio.start_server(serve, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            rng = random.Random(0)
+            microtests = [
+                functools.partial(microtest, offset=offset, port=port)
+                for offset in range(len(model))
+            ]
+            swarm = sds.Swarm(agent_count=30)
+            DH = sds.DH_uniform(hypotheses=range(len(search_space)), rng=rng)
+            D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+            T = sds.asynchronous.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+            I = sds.asynchronous.I_sync(D=D, T=T, swarm=swarm, concurrency=4)
+            await sds.asynchronous.SDS(I=I, H=sds.H_fixed(iterations=30))
+            server.close()
+            await server.wait_closed()
+            return swarm
+
+        swarm = asyncio.run(search())
+        self.assertEqual(swarm.largest_cluster.hyp, 14)
+        self.assertLessEqual(serving["most"], 4)
+        self.assertGreater(serving["most"], 1)
+
+    def test_compiled_iteration(self):
+        search_space = "xxxxxhexlodxxxhelloxxx"
+        hypotheses = range(len(search_space))
+        microtests = [
+            functools.partial(
+                string_search_microtest, offset=n, search_space=search_space
+            )
+            for n in range(5)
+        ]
+        modes = {
+            "passive": sds.D_passive,
+            "context_free": sds.variants.D_context_free,
+            "context_sensitive": sds.variants.D_context_sensitive,
+        }
+        iterations = {"sync": sds.I_sync, "async": sds.variants.I_async}
+        for diffusion, iteration in itertools.product(modes, iterations):
+            rng = random.Random(0)
+            swarm = sds.Swarm(agent_count=100)
+            DH = sds.DH_uniform(hypotheses=hypotheses, rng=rng)
+            D = modes[diffusion](DH=DH, swarm=swarm, rng=rng)
+            T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+            sds.SDS(I=iterations[iteration](D=D, T=T, swarm=swarm), H=sds.H_fixed(20))
+            compiled_rng = random.Random(0)
+            compiled_swarm = sds.Swarm(agent_count=100)
+            I = sds.compiled.I_compiled(
+                compiled_swarm,
+                hypotheses,
+                microtests,
+                compiled_rng,
+                diffusion=diffusion,
+                iteration=iteration,
+            )
+            sds.SDS(I=I, H=sds.H_fixed(20))
+            self.assertEqual(
+                [dict(agent) for agent in compiled_swarm],
+                [dict(agent) for agent in swarm],
+            )
+            self.assertEqual(compiled_rng.random(), rng.random())
+        with self.assertRaises(ValueError):
+            sds.compiled.I_compiled(
+                swarm, hypotheses, microtests, rng, diffusion="noise"
+            )
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_random_source(self):
+        small = sds.random_source.RandomSource(seed=3, block_size=7)
+        large = sds.random_source.RandomSource(seed=3)
+        population = range(10)
+        small.hypotheses.random()
+        drawn = [small.polls.choice(population) for n in range(20)]
+        drawn += small.polls.choices(population, k=30)
+        self.assertEqual(drawn, large.polls.choices(population, k=50))
+        search_space = "xxxxxhexlodxxxhelloxxx"
+        microtests = [
+            functools.partial(
+                string_search_microtest, offset=n, search_space=search_space
+            )
+            for n in range(5)
+        ]
+
+        def run(batched):
+            source = sds.random_source.RandomSource(seed=0, block_size=64)
+            swarm = sds.Swarm(agent_count=100)
+            DH = sds.DH_uniform(
+                hypotheses=range(len(search_space)), rng=source.hypotheses
+            )
+            D = sds.D_passive(DH=DH, swarm=swarm, rng=source.polls)
+            if batched:
+                T = sds.variants.T_batched(
+                    sds.variants.TM_batched(microtests, source.microtests)
+                )
+                I = sds.variants.I_sync_batched(D=D, T=T, swarm=swarm)
+            else:
+                T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=source.microtests))
+                I = sds.I_sync(D=D, T=T, swarm=swarm)
+            sds.SDS(I=I, H=sds.H_fixed(iterations=30))
+            return swarm
+
+        swarm = run(batched=False)
+        self.assertEqual(swarm.largest_cluster.hyp, 14)
+        self.assertEqual(
+            [dict(agent) for agent in run(batched=True)],
+            [dict(agent) for agent in swarm],
+        )
+
+    def test_interning(self):
+        search_space = "xxxxxhexlodxxxhelloxxx"
+        hypotheses = [(n, "offset") for n in range(len(search_space))]
+
+        def microtest(hyp, offset):
+            return string_search_microtest(hyp[0], offset, search_space)
+
+        microtests = [functools.partial(microtest, offset=n) for n in range(5)]
+
+        def run(table=None):
+            rng = random.Random(0)
+            swarm = sds.Swarm(agent_count=100)
+            if table is None:
+                DH = sds.DH_uniform(hypotheses=hypotheses, rng=rng)
+                TM = sds.TM_uniform(microtests, rng=rng)
+            else:
+                DH = sds.interning.DH_uniform(
+                    hypotheses=hypotheses, rng=rng, table=table
+                )
+                TM = sds.TM_uniform(
+                    sds.interning.decoded_microtests(microtests, table), rng=rng
+                )
+            D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+            T = sds.T_boolean(TM=TM)
+            sds.SDS(I=sds.I_sync(D=D, T=T, swarm=swarm), H=sds.H_fixed(30))
+            return swarm
+
+        swarm = run()
+        table = sds.interning.InternTable()
+        interned = run(table)
+        self.assertTrue(all(isinstance(agent.hyp, int) for agent in interned))
+        self.assertEqual(
+            [sds.interning.decode_agent(table, agent) for agent in interned],
+            [dict(agent) for agent in swarm],
+        )
+        self.assertEqual(
+            sds.interning.decode_clusters(table, interned.clusters), swarm.clusters
+        )
+        self.assertEqual(
+            sds.interning.decode_cluster(table, interned.largest_cluster).hyp,
+            (14, "offset"),
+        )
+        DH = sds.interning.DH_interned(lambda: (1, "offset"), table)
+        self.assertEqual(DH(), 1)
+        self.assertEqual(len(table), len(hypotheses))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_trace(self):
+        swarm, rng, removed_clusters, H, make_I = quorum_sensing_run(seed=1)
+        expected = []
+        with tempfile.TemporaryDirectory() as directory:
+            with sds.trace.Trace(
+                swarm,
+                directory,
+                top_k=2,
+                interval=3,
+                buffer_size=4,
+                sampled_agents=list(swarm)[:5],
+            ) as trace:
+                I = sds.trace.I_trace(make_I(), trace)
+                for iteration in range(1, 41):
+                    I()
+                    if iteration % 3 == 0:
+                        sizes = sorted(swarm.clusters.values(), reverse=True)[:2]
+                        hyps = [agent.hyp for agent in list(swarm)[:5]]
+                        expected.append(
+                            (
+                                swarm.activity,
+                                sizes + [0] * (2 - len(sizes)),
+                                len(swarm.removed),
+                                hyps,
+                            )
+                        )
+            self.assertEqual(len(os.listdir(directory)), 4)
+            history = sds.trace.load(directory)
+        self.assertEqual(list(history["iteration"]), list(range(3, 41, 3)))
+        self.assertEqual(
+            [
+                (activity, sizes, removed, hyps)
+                for activity, sizes, removed, hyps in zip(
+                    history["activity"].tolist(),
+                    history["cluster_sizes"].tolist(),
+                    history["removed"].tolist(),
+                    history["sampled_hyp"].tolist(),
+                )
+            ],
+            expected,
+        )
+        self.assertEqual(history["sampled_hyp"].shape, (13, 5))
+        swarm = sds.Swarm(swarm=[sds.Agent(True, 0.5), sds.Agent(False, None)])
+        with tempfile.TemporaryDirectory() as directory:
+            with sds.trace.Trace(swarm, directory, sampled_agents=swarm) as trace:
+                self.assertRaises(TypeError, trace.record)
+            with sds.trace.Trace(
+                swarm, directory, sampled_agents=swarm, hyp_typecode="d"
+            ) as trace:
+                trace.record()
+            history = sds.trace.load(directory)
+        self.assertEqual(history["sampled_hyp"][0, 0], 0.5)
+        self.assertTrue(numpy.isnan(history["sampled_hyp"][0, 1]))
+        swarm[1].hyp = (1, "offset")
+        table = sds.interning.InternTable()
+        with tempfile.TemporaryDirectory() as directory:
+            with sds.trace.Trace(
+                swarm, directory, sampled_agents=swarm, table=table
+            ) as trace:
+                trace.record()
+            history = sds.trace.load(directory)
+        self.assertEqual(
+            [table.decode(hyp_id) for hyp_id in history["sampled_hyp"][0]],
+            [0.5, (1, "offset")],
+        )
+
+    def test_result_store(self):
+        config = {
+            "task": {"search_space": "xxxxxhexlodxxxhelloxxx", "model": "hello"},
+            "swarm": {"agent_count": 30, "name": "Swarm"},
+            "DH": {"name": "DH_uniform"},
+            "TM": {"name": "TM_uniform"},
+            "D": {"name": "D_passive"},
+            "T": {"name": "T_boolean"},
+            "I": {"name": "I_sync"},
+            "H": {"name": "H_fixed", "iterations": 20},
+            "runs": 2,
+            "seed": 0,
+            "grid": {"D.name": ["D_passive"]},
+        }
+
+        def stored_count(directory):
+            return sum(len(files) for path, dirs, files in os.walk(directory))
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = sds.runner.ResultStore(directory)
+            first = sds.runner.sweep(config, processes=1, store=store)
+            self.assertEqual(stored_count(directory), 2)
+            result = first[0][1][0]
+            self.assertEqual(result.clusters[result.hyp] / 30, result.cluster_size)
+            config["grid"]["D.name"].append("D_context_sensitive")
+            second = sds.runner.sweep(config, processes=1, store=store)
+            self.assertEqual(second[0], first[0])
+            self.assertEqual(stored_count(directory), 4)
+            point_config = sds.runner.expand_grid(config)[0][1]
+            seed = first[0][1][0].seed
+            self.assertEqual(store.get(point_config, seed), first[0][1][0])
+            self.assertIsNone(
+                store.get(
+                    dict(point_config, H={"name": "H_fixed", "iterations": 21}), seed
+                )
+            )
+            store.invalidate(point_config, seed)
+            self.assertIsNone(store.get(point_config, seed))
+            third = sds.runner.sweep(config, processes=1, store=store, invalidate=True)
+            self.assertEqual(store.get(point_config, seed), third[0][1][0])
+            self.assertEqual(
+                third[0][1][1]._replace(seconds=None),
+                first[0][1][1]._replace(seconds=None),
+            )
+
+    def test_runner(self):
+        config = {
+            "task": {"search_space": "xxxxxhexlodxxxhelloxxx", "model": "hello"},
+            "swarm": {
+                "name": "ReducingSwarm",
+                "agent_count": 50,
+                "AgentClass": "QSAgent",
+            },
+            "DH": {"name": "DH_uniform"},
+            "TM": {"name": "TM_uniform"},
+            "D": {"name": "D_qs", "decay": 0.9},
+            "T": {"name": "T_reducing"},
+            "I": {"name": "I_sync"},
+            "H": {"name": "H_fixed", "iterations": 40},
+            "runs": 3,
+            "seed": 1,
+            "grid": {"D.quorum_threshold": [2, 3], "H.iterations": [5, 40]},
+        }
+        search_space, model = b"xxxxxhexlodxxxhelloxxx", b"hello"
+        rng = random.Random(0)
+        swarm = sds.reducing.ReducingSwarm(
+            agent_count=50, AgentClass=sds.reducing.QSAgent
+        )
+        hypotheses = sds.byte_search.make_hypotheses(search_space, model)
+        DH = sds.DH_uniform(hypotheses=hypotheses, rng=rng)
+        TM = sds.TM_uniform(
+            sds.byte_search.make_microtests(search_space, model), rng=rng
+        )
+        D = sds.reducing.D_qs(
+            DH=DH, quorum_threshold=3, decay=0.9, swarm=swarm, rng=rng
+        )
+        I = sds.I_sync(D=D, T=sds.reducing.T_reducing(TM=TM), swarm=swarm)
+        sds.SDS(I=I, H=sds.H_fixed(iterations=40))
+        point_config = sds.runner.expand_grid(config)[-1][1]
+        I, H, runner_swarm, answer = sds.runner.make_sds(point_config, seed=0)
+        sds.SDS(I=I, H=H)
+        self.assertEqual(answer, 14)
+        self.assertEqual(
+            [dict(agent) for agent in runner_swarm], [dict(agent) for agent in swarm]
+        )
+
+        def without_time(swept):
+            return [
+                (point, [result._replace(seconds=None) for result in results])
+                for point, results in swept
+            ]
+
+        answers = {}
+        point_configs = [
+            point_config for point, point_config in sds.runner.expand_grid(config)
+        ]
+        answered = [
+            sds.runner.with_answer(point_config, answers)
+            for point_config in point_configs
+        ]
+        self.assertEqual(
+            [point_config["task"]["answer"] for point_config in answered], [14] * 4
+        )
+        self.assertEqual(len(answers), 1)
+        missing = dict(config, task={"search_space": "xxxxx", "model": "hello"})
+        self.assertIsNone(sds.runner.with_answer(missing, answers)["task"]["answer"])
+        serial = sds.runner.sweep(config, processes=1)
+        self.assertEqual(
+            [point for point, results in serial][1],
+            {"D.quorum_threshold": 2, "H.iterations": 40},
+        )
+        self.assertEqual(
+            without_time(sds.runner.sweep(config, processes=2)), without_time(serial)
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "config.json")
+            with open(path, "w") as f:
+                json.dump(config, f)
+            output = os.path.join(directory, "results.csv")
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(
+                    sds.runner.main([path, "--processes", "1", "--output", output]), 0
+                )
+            with open(output) as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["runs"], "3")
+
+    def test_adaptive_swarm(self):
+        search_space = "x" * 50 + "hello" + "x" * 50
+        calls = collections.Counter()
+
+        def microtest(hyp, offset):
+            calls["microtests"] += 1
+            return string_search_microtest(hyp, offset, search_space)
+
+        def run(adaptive):
+            calls.clear()
+            rng = random.Random(0)
+            microtests = [functools.partial(microtest, offset=n) for n in range(5)]
+            swarm = sds.counting.CountingSwarm(agent_count=400)
+            DH = sds.DH_uniform(hypotheses=range(len(search_space)), rng=rng)
+            D = sds.D_passive(DH=DH, swarm=swarm, rng=rng)
+            T = sds.T_boolean(TM=sds.TM_uniform(microtests, rng=rng))
+            I = sds.I_sync(D=D, T=T, swarm=swarm)
+            if adaptive:
+                A = sds.adaptive.A_cluster_stability(
+                    swarm, min_agents=25, max_agents=400, window=3
+                )
+                I = sds.adaptive.I_adaptive(I, swarm, A, rng)
+            H = sds.variants.H_settled_cluster(swarm, tolerance=0.05)
+            sds.SDS(I=I, H=H)
+            counted = sds.Swarm(swarm=list(swarm))
+            self.assertEqual(swarm.clusters, counted.clusters)
+            self.assertEqual(swarm.activity, counted.activity)
+            return swarm, calls["microtests"]
+
+        fixed_swarm, fixed_calls = run(adaptive=False)
+        adaptive_swarm, adaptive_calls = run(adaptive=True)
+        self.assertEqual(adaptive_swarm.largest_cluster.hyp, 50)
+        self.assertEqual(fixed_swarm.largest_cluster.hyp, 50)
+        self.assertLess(len(adaptive_swarm), 400)
+        self.assertLess(adaptive_calls, fixed_calls * 0.6)
+        sds.adaptive.resize(
+            adaptive_swarm, 60, random.Random(1), sds.counting.CountingAgent
+        )
+        adaptive_swarm[-1].active, adaptive_swarm[-1].hyp = True, 3
+        self.assertEqual(len(adaptive_swarm), 60)
+        self.assertEqual(
+            adaptive_swarm.clusters, sds.Swarm(swarm=list(adaptive_swarm)).clusters
+        )
+        A = sds.adaptive.A_cluster_stability(
+            adaptive_swarm, min_agents=25, max_agents=400, min_activity=1
+        )
+        self.assertEqual(A(), 120)
+
+        swarm, rng, removed_clusters, H, make_I = quorum_sensing_run(
+            seed=1, agent_count=10
+        )
+        I = make_I()
+        list(swarm)[0].remove(final_hyp=0)
+        sds.adaptive.resize(swarm, 4, rng, sds.reducing.QSAgent)
+        self.assertEqual(
+            sorted(map(id, swarm.remaining)),
+            sorted(map(id, (a for a in swarm if not a.removed))),
+        )
+        self.assertTrue(set(map(id, swarm.removed)) <= set(map(id, swarm)))
+        sds.adaptive.resize(swarm, 8, rng, sds.reducing.QSAgent)
+        self.assertEqual(
+            len(swarm.remaining), len([agent for agent in swarm if not agent.removed])
+        )
+        self.assertTrue(all(agent in swarm.remaining for agent in list(swarm)[4:]))
+        for iteration in range(5):
+            I()
+        self.assertTrue(all(agent.hyp is not None for agent in swarm))
+
+        swarm = sds.reducing.ReducingSwarm(agent_count=4)
+        H = sds.reducing.H_all_terminating(swarm)
+        original = list(swarm)
+        sds.adaptive.resize(swarm, 8, random.Random(0), sds.reducing.ReducingAgent)
+        for agent in original:
+            agent.terminating = True
+        self.assertFalse(H())
+        for agent in swarm:
+            agent.terminating = True
+        self.assertTrue(H())
+
+        swarm = sds.counting.CountingSwarm(agent_count=10)
+        for agent in swarm:
+            agent.active, agent.hyp = True, 1
+        agents = list(swarm)
+        sds.adaptive.resize(swarm, 4, random.Random(0), sds.counting.CountingAgent)
+        dropped = [agent for agent in agents if agent not in swarm]
+        self.assertEqual(len(dropped), 6)
+        self.assertTrue(all(agent.swarm is None for agent in dropped))
+        dropped[0].hyp = 2
+        self.assertEqual(swarm.clusters, {1: 4})
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_multi_query(self):
+        search_space = "xxxxxhexlodxxxhelloxxxworldxxx"
+        models = ["hello", "world", "lod"]
+        halting_iterations = iter([40, 50, 60])
+
+        def make_H(swarm):
+            return sds.H_fixed(iterations=next(halting_iterations))
+
+        queries = sds.multi_query.search(
+            search_space, models, agent_count=100, make_H=make_H, seed=3
+        )
+        self.assertEqual([query.largest_cluster.hyp for query in queries], [14, 22, 8])
+        self.assertEqual([query.iterations for query in queries], [40, 50, 60])
+        self.assertTrue(all(query.halted for query in queries))
+        self.assertEqual([len(query.swarm) for query in queries], [100, 100, 100])
+        with self.assertRaises(ValueError):
+            sds.multi_query.search(search_space, ["x" * 40], 10, make_H)
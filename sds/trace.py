@@ -0,0 +1,214 @@
+import array
+import heapq
+import math
+import numpy
+import os
+
+typecodes = {"activity": "d"}
+
+
+class Trace:
+    """ Records the history of a swarm into columns, written to .npz files in
+    chunks """
+
+    def __init__(
+        self,
+        swarm,
+        directory,
+        top_k=3,
+        interval=1,
+        buffer_size=4096,
+        sampled_agents=(),
+        hyp_typecode="q",
+        table=None,
+    ):
+
+        if hyp_typecode not in ("q", "d"):
+
+            raise ValueError(f"hyp_typecode must be 'q' or 'd', not {hyp_typecode!r}")
+
+        if table is not None:
+
+            hyp_typecode = "q"
+
+        self.swarm = swarm
+        self.directory = directory
+        self.top_k = top_k
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.sampled_agents = list(sampled_agents)
+        self.hyp_typecode = hyp_typecode
+        self.table = table
+        self.typecodes = dict(typecodes, sampled_hyp=hyp_typecode)
+        self.reducing = hasattr(swarm, "remaining")
+        self.iteration = 0
+        self.row = 0
+        self.chunk = 0
+
+        self.widths = {"iteration": None, "activity": None, "cluster_sizes": top_k}
+
+        if self.reducing:
+
+            self.widths.update(terminating=None, removed=None)
+
+        if self.sampled_agents:
+
+            self.widths.update(
+                sampled_active=len(self.sampled_agents),
+                sampled_hyp=len(self.sampled_agents),
+            )
+
+        self.columns = {
+            name: array.array(
+                self.typecodes.get(name, "q"), bytes(8 * buffer_size * (width or 1))
+            )
+            for name, width in self.widths.items()
+        }
+
+    def record(self):
+        """ Count an iteration, and record a row if it is due """
+
+        self.iteration += 1
+
+        if self.iteration % self.interval:
+
+            return
+
+        row = self.row
+        top_k = self.top_k
+        swarm = self.swarm
+        columns = self.columns
+
+        columns["iteration"][row] = self.iteration
+        columns["activity"][row] = swarm.activity
+
+        if hasattr(swarm, "top_k"):
+
+            sizes = [agents for hyp, agents in swarm.top_k(top_k)]
+
+        else:
+
+            sizes = heapq.nlargest(top_k, swarm.clusters.values())
+
+        sizes.extend([0] * (top_k - len(sizes)))
+        columns["cluster_sizes"][row * top_k : (row + 1) * top_k] = array.array(
+            "q", sizes
+        )
+
+        if self.reducing:
+
+            remaining = swarm.remaining
+
+            columns["terminating"][row] = remaining.terminating
+            columns["removed"][row] = len(remaining.removed)
+
+        if self.sampled_agents:
+
+            count = len(self.sampled_agents)
+
+            columns["sampled_active"][row * count : (row + 1) * count] = array.array(
+                "q", [bool(agent.active) for agent in self.sampled_agents]
+            )
+            try:
+
+                hyps = array.array(self.hyp_typecode, self.sampled_hyps())
+
+            except TypeError as error:
+
+                raise TypeError(
+                    "Sampled hypotheses must be integers, pass hyp_typecode='d' for "
+                    "other numbers, or an InternTable as table for other hypotheses"
+                ) from error
+
+            columns["sampled_hyp"][row * count : (row + 1) * count] = hyps
+
+        self.row += 1
+
+        if self.row == self.buffer_size:
+
+            self.flush()
+
+    def sampled_hyps(self):
+
+        hyps = [agent.hyp for agent in self.sampled_agents]
+
+        if self.table is not None:
+
+            return [-1 if hyp is None else self.table.intern(hyp) for hyp in hyps]
+
+        missing = -1 if self.hyp_typecode == "q" else math.nan
+
+        return [missing if hyp is None else hyp for hyp in hyps]
+
+    def flush(self):
+        """ Write the recorded rows to the next chunk file """
+
+        if not self.row:
+
+            return
+
+        arrays = {}
+
+        for name, column in self.columns.items():
+
+            width = self.widths[name]
+
+            values = numpy.frombuffer(column, dtype=column.typecode)[
+                : self.row * (width or 1)
+            ]
+
+            if width is not None:
+
+                values = values.reshape(self.row, width)
+
+            arrays[name] = values
+
+        numpy.savez_compressed(
+            os.path.join(self.directory, f"trace-{self.chunk:06d}.npz"), **arrays
+        )
+
+        self.chunk += 1
+        self.row = 0
+
+    def close(self):
+
+        self.flush()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc_info):
+
+        self.close()
+
+
+def I_trace(I, trace):
+    def I_prime():
+
+        I()
+
+        trace.record()
+
+    return I_prime
+
+
+def load(directory):
+
+    chunks = []
+
+    for name in sorted(os.listdir(directory)):
+
+        if name.startswith("trace-") and name.endswith(".npz"):
+
+            with numpy.load(os.path.join(directory, name)) as chunk:
+
+                chunks.append(dict(chunk))
+
+    if not chunks:
+
+        return {}
+
+    return {
+        name: numpy.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]
+    }
@@ -1,4 +1,14 @@
+import collections
+import datetime
 import itertools
+import logging
+import math
+import operator
+import time
+
+log = logging.getLogger(__name__)
+
+SILENT = logging.DEBUG - 5
 
 
 def I_report(I, report_num, report_function):
@@ -33,6 +43,18 @@ def I_async(D, T, swarm):
     return I_prime
 
 
+def I_sync_batched(D, T, swarm):
+    def I():
+
+        for agent in swarm:
+
+            D(agent)
+
+        T(swarm)
+
+    return I
+
+
 def H_time(duration):
 
     start = None
@@ -45,7 +67,7 @@ def H_time(duration):
 
             start = datetime.datetime.now()
 
-        return (now - start) > duration
+        return (datetime.datetime.now() - start) > duration
 
     return H
 
@@ -187,6 +209,75 @@ def TM_multitesting(microtests, rng, multitesting_amount, combinator):
     return TM
 
 
+def T_batched(TM):
+    """ Boolean testing of a list of agents with a single microtest call """
+
+    def T(agents):
+
+        microtest = TM(len(agents))
+
+        results = microtest([agent.hyp for agent in agents])
+
+        for agent, result in zip(agents, results):
+
+            agent.active = result
+
+    return T
+
+
+def batched(microtest):
+    """ Mark a microtest as taking a list of hypotheses and returning a list
+    of results """
+
+    microtest.batched = True
+
+    return microtest
+
+
+def TM_batched(microtests, rng):
+    """ Uniformly random microtest selection for a list of hypotheses """
+
+    indices = range(len(microtests))
+
+    def TM(count):
+
+        groups = [[] for microtest in microtests]
+
+        for position, index in enumerate(rng.choices(indices, k=count)):
+
+            groups[index].append(position)
+
+        def microtest(hyps):
+
+            results = [None] * count
+
+            for test, group in zip(microtests, groups):
+
+                if not group:
+
+                    continue
+
+                group_hyps = [hyps[position] for position in group]
+
+                if getattr(test, "batched", False):
+
+                    group_results = test(group_hyps)
+
+                else:
+
+                    group_results = map(test, group_hyps)
+
+                for position, result in zip(group, group_results):
+
+                    results[position] = result
+
+            return results
+
+        return microtest
+
+    return TM
+
+
 def H_threshold(swarm, threshold):
     """ Makes a function for halting once the global activity is over a fixed
     threshold """
@@ -235,16 +326,18 @@ def H_elite_cluster_consensus(swarm, elite_count, rng):
 
     elite_agents = rng.sample(swarm, elite_count)
 
+    same_cluster = getattr(swarm, "same_cluster", operator.eq)
+
     def H():
 
-        elite_agent_gen = (agent for agent in swarm if agent in elite_agents)
+        elite_agent_gen = iter(elite_agents)
 
         first_elite_agent = next(elite_agent_gen)
 
         elite_hyp = first_elite_agent.hyp
 
         return first_elite_agent.active and all(
-            elite_agent.active and elite_agent.hyp == elite_hyp
+            elite_agent.active and same_cluster(elite_agent.hyp, elite_hyp)
             for elite_agent in elite_agent_gen
         )
 
@@ -257,21 +350,37 @@ def H_stable(swarm, max_memory_length, stability_threshold, min_stable_iteration
 
     stable_iterations = 0
 
+    mean_activity = 0
+
+    sum_of_squared_deviations = 0
+
     def H():
 
-        nonlocal stable_iterations
+        nonlocal stable_iterations, mean_activity, sum_of_squared_deviations
 
         activity = swarm.activity
 
-        memory.append(activity)
+        if len(memory) == memory.maxlen:
+
+            forgotten = memory.popleft()
 
-        mean_activity = sum(memory) / len(memory)
+            if memory:
 
-        deviations = [activity - mean_activity for activity in memory]
+                deviation = forgotten - mean_activity
+                mean_activity -= deviation / len(memory)
+                sum_of_squared_deviations -= deviation * (forgotten - mean_activity)
 
-        sum_of_squared_deviations = sum(pow(deviation, 2) for deviation in deviations)
+            else:
 
-        standard_deviation = math.sqrt(sum_of_squared_deviations / len(memory))
+                mean_activity = sum_of_squared_deviations = 0
+
+        memory.append(activity)
+
+        deviation = activity - mean_activity
+        mean_activity += deviation / len(memory)
+        sum_of_squared_deviations += deviation * (activity - mean_activity)
+
+        standard_deviation = math.sqrt(max(sum_of_squared_deviations, 0) / len(memory))
 
         if standard_deviation > stability_threshold:
 
@@ -365,6 +474,127 @@ def H_strong(
     return H
 
 
+def normal_cdf(x):
+
+    return (1 + math.erf(x / math.sqrt(2))) / 2
+
+
+def trend_confidence(values, tolerance):
+    """ The confidence that the trend of values changes by less than
+    tolerance over their length """
+
+    n = len(values)
+
+    if n < 3:
+
+        raise ValueError(f"At least 3 values are needed for a trend, not {n}")
+
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+
+    sum_xx = sum((x - mean_x) ** 2 for x in range(n))
+    sum_xy = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+
+    slope = sum_xy / sum_xx
+
+    residuals = sum(
+        (y - mean_y - slope * (x - mean_x)) ** 2 for x, y in enumerate(values)
+    )
+
+    change = slope * n
+    change_error = math.sqrt(residuals / (n - 2) / sum_xx) * n
+
+    if change_error == 0:
+
+        return 1.0 if abs(change) < tolerance else 0.0
+
+    p_value = max(
+        normal_cdf((change - tolerance) / change_error),
+        normal_cdf((-tolerance - change) / change_error),
+    )
+
+    return 1 - p_value
+
+
+def H_settled_cluster(swarm, tolerance, confidence=0.95, window=20):
+    """ Makes a function for halting once the share of the largest cluster
+    has settled within tolerance """
+
+    if window < 3:
+
+        raise ValueError(f"window must be at least 3, not {window}")
+
+    shares = collections.deque(maxlen=window)
+
+    largest_hyp = None
+
+    def H():
+
+        nonlocal largest_hyp
+
+        cluster = swarm.largest_cluster
+
+        if cluster.hyp != largest_hyp:
+
+            shares.clear()
+
+            largest_hyp = cluster.hyp
+
+        shares.append(cluster.size)
+
+        if len(shares) < window:
+
+            H.confidence = 0.0
+
+            return False
+
+        H.confidence = trend_confidence(shares, tolerance)
+
+        log.log(
+            SILENT,
+            "Largest cluster %s settled with confidence %s",
+            largest_hyp,
+            H.confidence,
+        )
+
+        return H.confidence >= confidence
+
+    H.confidence = 0.0
+
+    return H
+
+
+def H_settled_activity(swarm, tolerance, confidence=0.95, window=20):
+    """ Makes a function for halting once the activity has settled within
+    tolerance """
+
+    if window < 3:
+
+        raise ValueError(f"window must be at least 3, not {window}")
+
+    activities = collections.deque(maxlen=window)
+
+    def H():
+
+        activities.append(swarm.activity)
+
+        if len(activities) < window:
+
+            H.confidence = 0.0
+
+            return False
+
+        H.confidence = trend_confidence(activities, tolerance)
+
+        log.log(SILENT, "Activity settled with confidence %s", H.confidence)
+
+        return H.confidence >= confidence
+
+    H.confidence = 0.0
+
+    return H
+
+
 def all_functions(*function_list):
     def F():
 
@@ -389,6 +619,50 @@ def any_functions(*function_list):
     return F
 
 
+def H_every(H, iterations):
+    """ Makes a function for calling H once every number of iterations """
+
+    iteration_count = 0
+
+    def H_prime():
+
+        nonlocal iteration_count
+
+        iteration_count += 1
+
+        if iteration_count < iterations:
+
+            return False
+
+        iteration_count = 0
+
+        return H()
+
+    return H_prime
+
+
+def H_interval(H, seconds):
+    """ Makes a function for calling H at most once every number of seconds """
+
+    last_call = None
+
+    def H_prime():
+
+        nonlocal last_call
+
+        now = time.monotonic()
+
+        if last_call is not None and now - last_call < seconds:
+
+            return False
+
+        last_call = now
+
+        return H()
+
+    return H_prime
+
+
 def round_clusters(clusters):
 
     rounded_clusters = collections.Counter()
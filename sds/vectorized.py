@@ -0,0 +1,169 @@
+import collections
+import numpy
+import sds.standard
+from sds.standard import Cluster
+
+
+class Swarm:
+    """ A swarm stored as an array of activities and an array of integer
+    hypotheses, the hypothesis of an inactive agent can be undefined. """
+
+    def __init__(self, agent_count=None, active=None, hyp=None, dtype=numpy.int64):
+
+        if active is None:
+
+            if agent_count is None:
+
+                raise ValueError("One of agent_count or active must be passed")
+
+            active = numpy.zeros(agent_count, dtype=bool)
+
+        self.active = numpy.asarray(active, dtype=bool)
+
+        if hyp is None:
+
+            hyp = numpy.zeros(len(self.active), dtype=dtype)
+
+        self.hyp = numpy.asarray(hyp)
+
+        if self.hyp.shape != self.active.shape:
+
+            raise ValueError("active and hyp must be the same length")
+
+    def __len__(self):
+
+        return len(self.active)
+
+    def __str__(self):
+
+        return ", ".join(
+            f"(Hyp:{hyp}, Agents:{cluster_size})"
+            for hyp, cluster_size in self.clusters.most_common()
+        )
+
+    @property
+    def activity(self):
+
+        if not len(self):
+
+            return 0
+
+        return numpy.count_nonzero(self.active) / len(self)
+
+    @property
+    def clusters(self):
+
+        hyps, sizes = numpy.unique(self.hyp[self.active], return_counts=True)
+
+        return collections.Counter(dict(zip(hyps.tolist(), sizes.tolist())))
+
+    @property
+    def largest_cluster(self):
+
+        hyps, sizes = numpy.unique(self.hyp[self.active], return_counts=True)
+
+        if not sizes.size:
+
+            return Cluster(hyp=None, agents=0, size=0 / len(self))
+
+        largest = sizes.argmax()
+
+        agents = int(sizes[largest])
+
+        return Cluster(hyp=hyps[largest].item(), agents=agents, size=agents / len(self))
+
+    def report_clusters(self, significant_hypotheses):
+
+        return sds.standard.Swarm.report_clusters(self, significant_hypotheses)
+
+
+def I_sync(D, T, swarm):
+    def I():
+
+        D(swarm)
+
+        T(swarm)
+
+    return I
+
+
+def D_passive(DH, swarm, rng):
+    def D(agents):
+
+        inactive = numpy.flatnonzero(~agents.active)
+
+        polled = rng.integers(len(swarm), size=inactive.size)
+
+        polled_active = swarm.active[polled]
+
+        agents.hyp[inactive[polled_active]] = swarm.hyp[polled[polled_active]]
+
+        new_hyp = inactive[~polled_active]
+
+        agents.hyp[new_hyp] = DH(new_hyp.size)
+
+    return D
+
+
+def DH_uniform(hypotheses, rng):
+    """ Uniformly random hypothesis generation """
+
+    if isinstance(hypotheses, range):
+
+        def DH(count):
+
+            index = rng.integers(len(hypotheses), size=count)
+
+            return hypotheses.start + hypotheses.step * index
+
+    else:
+
+        hypotheses = numpy.asarray(hypotheses)
+
+        def DH(count):
+
+            return hypotheses[rng.integers(len(hypotheses), size=count)]
+
+    return DH
+
+
+def TM_uniform(microtests, rng):
+    """ Uniformly random microtest selection """
+
+    def TM(count):
+
+        selected = rng.integers(len(microtests), size=count)
+
+        order = numpy.argsort(selected, kind="stable")
+
+        group_ends = numpy.cumsum(numpy.bincount(selected, minlength=len(microtests)))
+
+        groups = numpy.split(order, group_ends[:-1])
+
+        def microtest(hyp):
+
+            result = numpy.zeros(count, dtype=bool)
+
+            for test, group in zip(microtests, groups):
+
+                if group.size:
+
+                    result[group] = test(hyp[group])
+
+            return result
+
+        return microtest
+
+    return TM
+
+
+def T_boolean(TM):
+    """ Boolean testing """
+
+    def T(agents):
+
+        microtest = TM(len(agents))
+
+        agents.active[:] = microtest(agents.hyp)
+
+    return T
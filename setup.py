@@ -1,9 +1,17 @@
+import os
+import re
+
 from setuptools import setup
 
+with open(os.path.join(os.path.dirname(__file__), "sds", "__init__.py")) as f:
+
+    version = re.search(r'^__version__ = "(.*)"$', f.read(), re.MULTILINE).group(1)
+
 setup(
     name="sds",
-    version="2.0.1",
+    version=version,
     packages=["sds"],
+    extras_require={"vectorized": ["numpy"]},
     description="Stochastic Diffusion Search",
     keywords=["swarm", "artificial", "intelligence", "search"],
     classifiers=[